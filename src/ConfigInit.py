@@ -217,12 +217,23 @@ class ConfigInit():
 		config.plugins.moviecockpit.selection_color           = ConfigSelection(default="#cccc00", choices=choices_color_mark)
 		config.plugins.moviecockpit.selection_color_sel       = ConfigSelection(default="#ffff00", choices=choices_color_mark)
 		config.plugins.moviecockpit.list_sort                 = ConfigSelection(default="0", choices=choices_sort)
+		config.plugins.moviecockpit.list_sort_articles        = ConfigYesNo(default=False)
 		config.plugins.moviecockpit.list_selmove              = ConfigSelection(default="d", choices=choices_move)
 		config.plugins.moviecockpit.list_style                = ConfigNumber(default=1)
 		config.plugins.moviecockpit.timer_autoclean           = ConfigYesNo(default=False)
 		config.plugins.moviecockpit.launch_key                = ConfigSelection(default="showMovies", choices=choices_launch_key)
 		config.plugins.moviecockpit.list_bouquet_keys         = ConfigSelection(default="", choices=choices_bqt)
 		config.plugins.moviecockpit.list_skip_size            = ConfigSelectionNumber(3, 10, 1, default=5)
+		config.plugins.moviecockpit.cache_reload_incremental  = ConfigYesNo(default=True)
+		config.plugins.moviecockpit.cache_load_chunk_size     = ConfigSelectionNumber(100, 5000, 100, default=500)
+		config.plugins.moviecockpit.cache_load_workers        = ConfigSelectionNumber(1, 8, 1, default=4)
+		config.plugins.moviecockpit.cache_load_time_budget    = ConfigSelectionNumber(10, 200, 10, default=30)
+		config.plugins.moviecockpit.cache_lazy_load           = ConfigYesNo(default=True)
+		config.plugins.moviecockpit.cache_follow_symlinks     = ConfigYesNo(default=True)
+		config.plugins.moviecockpit.cache_watch               = ConfigYesNo(default=True)
+		config.plugins.moviecockpit.cache_watch_poll_interval = ConfigSelectionNumber(1, 60, 1, default=5)
+		config.plugins.moviecockpit.cache_in_ram              = ConfigYesNo(default=False)
+		config.plugins.moviecockpit.cache_checkpoint_interval = ConfigSelectionNumber(5, 120, 5, default=30)
 		config.plugins.moviecockpit.debug                     = ConfigYesNo(default=False)
 		config.plugins.moviecockpit.debug_log_path            = ConfigText(default="/media/hdd", fixed_size=False, visible_width=35)
 
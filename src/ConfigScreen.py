@@ -36,6 +36,7 @@ from Screens.Standby import TryQuitMainloop
 from Tools.Directories import resolveFilename, SCOPE_PLUGINS
 from Version import VERSION
 from Trashcan import Trashcan
+from FileCache import FileCache
 from StylesScreen import StylesScreen
 
 
@@ -133,6 +134,7 @@ class ConfigScreen(ConfigListScreen, Screen):
 			(_("Show plugin in extensions menu")                , config.plugins.moviecockpit.extmenu_plugin            , self.needsRestart     , None                  , 0     , []          , _("Help Show plugin in extensions menu")),
 			(_("Movie home at start")                           , config.plugins.moviecockpit.list_start_home           , None                  , None                  , 0     , []          , _("Help Movie home at start")),
 			(_("Default sort mode")                             , config.plugins.moviecockpit.list_sort                 , None                  , None                  , 0     , []          , _("Help Sort mode at startup")),
+			(_("Ignore leading articles in alpha sort")         , config.plugins.moviecockpit.list_sort_articles        , self.updateSortKeys   , None                  , 1     , []          , _("Help Ignore leading articles in alpha sort")),
 			(self.section                                       , _("KEY-MAPPING")                                      , None                  , None                  , 0     , []          , ""),
 			(_("Bouquet buttons behavior")                      , config.plugins.moviecockpit.list_bouquet_keys         , None                  , None                  , 0     , []          , _("Help Bouquet buttons behavior")),
 			(_("List entries to skip")                          , config.plugins.moviecockpit.list_skip_size            , None                  , None                  , 0     , []          , _("Help List entries to skip")),
@@ -184,6 +186,17 @@ class ConfigScreen(ConfigListScreen, Screen):
 			(_("Primary playback audio language")               , config.plugins.moviecockpit.audlang1                  , None                  , None                  , 1     , [-2]        , _("Help Primary playback audio language")),
 			(_("Secondary playback audio language")             , config.plugins.moviecockpit.audlang2                  , None                  , None                  , 1     , [-3]        , _("Help Secondary playback audio language")),
 			(_("Tertiary playback audio language")              , config.plugins.moviecockpit.audlang3                  , None                  , None                  , 1     , [-4]        , _("Help Tertiary playback audio language")),
+			(self.section                                       , _("CACHE")                                            , None                  , None                  , 2     , []          , ""),
+			(_("Reload only new or changed files")              , config.plugins.moviecockpit.cache_reload_incremental  , None                  , None                  , 2     , []          , _("Help Reload only new or changed files")),
+			(_("Cache load chunk size")                         , config.plugins.moviecockpit.cache_load_chunk_size     , None                  , None                  , 2     , []          , _("Help Cache load chunk size")),
+			(_("Cache load worker threads")                     , config.plugins.moviecockpit.cache_load_workers        , None                  , None                  , 2     , []          , _("Help Cache load worker threads")),
+			(_("Cache load time slice (ms)")                    , config.plugins.moviecockpit.cache_load_time_budget    , None                  , None                  , 2     , []          , _("Help Cache load time slice (ms)")),
+			(_("Load directories on first access")              , config.plugins.moviecockpit.cache_lazy_load           , None                  , None                  , 2     , []          , _("Help Load directories on first access")),
+			(_("Follow symbolic links")                         , config.plugins.moviecockpit.cache_follow_symlinks     , None                  , None                  , 2     , []          , _("Help Follow symbolic links")),
+			(_("Watch bookmarks for file changes")              , config.plugins.moviecockpit.cache_watch               , self.needsRestart     , None                  , 2     , []          , _("Help Watch bookmarks for file changes")),
+			(_("Network share polling interval (minutes)")      , config.plugins.moviecockpit.cache_watch_poll_interval , None                  , None                  , 2     , [-1]        , _("Help Network share polling interval (minutes)")),
+			(_("Keep cache database in RAM")                    , config.plugins.moviecockpit.cache_in_ram              , self.needsRestart     , None                  , 2     , []          , _("Help Keep cache database in RAM")),
+			(_("Cache checkpoint interval (minutes)")           , config.plugins.moviecockpit.cache_checkpoint_interval , None                  , None                  , 2     , [-1]        , _("Help Cache checkpoint interval (minutes)")),
 			(self.section                                       , _("DEBUG")                                            , None                  , None                  , 1     , []          , ""),
 			(_("Debug log")                                     , config.plugins.moviecockpit.debug                     , self.setDebugMode     , None                  , 0     , []          , _("Help Debug")),
 			(_("Log file path")                                 , config.plugins.moviecockpit.debug_log_path            , self.validatePath     , self.openLocationBox  , 0     , [-1]        , _("Help Log file path")),
@@ -370,6 +383,10 @@ class ConfigScreen(ConfigListScreen, Screen):
 			config.plugins.moviecockpit.trashcan_enable.save()
 		return True
 
+	def updateSortKeys(self, element):
+		FileCache.getInstance().updateSortKeys(element.value)
+		return True
+
 	def needsRestart(self, _element=None):
 		self.needs_restart_flag = True
 		return True
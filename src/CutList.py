@@ -66,9 +66,14 @@ def removeCutListMarks(path):
 
 
 def deleteCutList(path):
+	deleteCutLists([path])
+
+
+def deleteCutLists(paths):
 	data = ""
-	FileCache.getInstance().update(path, cuts=data)
-	deleteFile(path)
+	for path in paths:
+		deleteFile(path + ".cuts")
+	FileCache.getInstance().updateList(paths, cuts=data)
 
 
 def reloadCutList(path):
@@ -103,6 +103,17 @@ def getCutListLast(cut_list):
 	return 0
 
 
+def getCutListProgress(cut_list, length):
+	# percentage of length (in seconds) played up to the last position of cut_list
+	last = ptsToSeconds(getCutListLast(cut_list))
+	progress = 0
+	if length > 0 and last > 0:
+		if last > length:
+			last = length
+		progress = int(round(float(last) / float(length), 2) * 100)
+	return progress
+
+
 def replaceLast(cut_list, pts):
 	for cp in cut_list:
 		_pts, what = cp
@@ -21,19 +21,46 @@
 
 import os
 import time
+from collections import OrderedDict
+from Components.config import config
 from Bookmarks import getBookmarks
-from FileCacheSQL import FileCacheSQL
+from FileCacheSQL import FileCacheSQL, SQL_LISTDATA
+from FileCacheLoader import FileCacheLoader
 from datetime import datetime
 from ParserEitFile import ParserEitFile
 from ParserMetaFile import ParserMetaFile
+from ParserCache import ParserCache
 from CutListUtils import unpackCutList, ptsToSeconds, getCutListLength
 from ServiceUtils import EXT_TS, EXT_VIDEO
-from FileUtils import readFile, deleteFile
+from FileUtils import readFile, writeFile, deleteFile, copyFile, scanDir
 from DelayTimer import DelayTimer
 from UnicodeUtils import convertToUtf8
 
 
 SQL_DB_NAME = "/etc/enigma2/moviecockpit.db"
+# database on tmpfs, which is checkpointed to SQL_DB_NAME
+SQL_RAM_DB_NAME = "/tmp/moviecockpit.db"
+# exists while the ram database has changes which may not be checkpointed yet
+SQL_CHECKPOINT_PENDING = "/etc/enigma2/.moviecockpit_checkpoint"
+
+
+# max number of rows kept by the getFile() row cache
+ROW_CACHE_SIZE = 256
+
+# max number of rows returned by getSearchList()
+SEARCH_MAX_RESULTS = 500
+
+# virtual dirs of views over all bookmarks: the prefix of the search results for the text following it
+# (see getSearchList()), the prefix of the files with the tag following it (see getTagList()),
+# and the dirs of the latest and of the unwatched files (see getLatestList() and getUnwatchedList())
+SEARCH_DIR = "search:"
+TAG_DIR = "tag:"
+LATEST_DIR = "latest:"
+UNWATCHED_DIR = "unwatched:"
+VIEW_DIRS = [SEARCH_DIR, TAG_DIR, LATEST_DIR, UNWATCHED_DIR]
+
+# number of files of the latest view
+LATEST_COUNT = 100
 
 
 # file indexes
@@ -55,6 +82,29 @@ FILE_IDX_CUTS = 14
 FILE_IDX_TAGS = 15
 
 
+# list row indexes, see getFileList(), getDirList() and getListRows()
+LIST_IDX_DIR = 0
+LIST_IDX_TYPE = 1
+LIST_IDX_PATH = 2
+LIST_IDX_FILENAME = 3
+LIST_IDX_EXT = 4
+LIST_IDX_NAME = 5
+LIST_IDX_EVENT_START_TIME = 6
+LIST_IDX_LENGTH = 7
+LIST_IDX_DESCRIPTION = 8
+LIST_IDX_SERVICE_REFERENCE = 9
+LIST_IDX_SIZE = 10
+LIST_IDX_TAGS = 11
+LIST_IDX_PROGRESS = 12
+
+
+# update() keyword aliases for column names
+FILE_COLUMN_ALIASES = {
+	"filename": "fileName",
+	"ext": "fileExt",
+}
+
+
 # filetype values
 FILE_TYPE_FILE = 1
 FILE_TYPE_DIR = 2
@@ -67,11 +117,67 @@ class FileCache(FileCacheSQL):
 
 	def __init__(self):
 		print("MVC-I: FileCache: __init__")
-		FileCacheSQL.__init__(self, SQL_DB_NAME)
-		if not os.path.exists(SQL_DB_NAME) or os.path.exists("/etc/enigma2/.moviecockpit"):
+		database_exists = os.path.exists(SQL_DB_NAME)
+		# the flag file requests a rebuild of the cache
+		reload_database = os.path.exists("/etc/enigma2/.moviecockpit")
+		resync_database = False
+		self.sql_in_ram = config.plugins.moviecockpit.cache_in_ram.value
+		if self.sql_in_ram:
+			if database_exists and not os.path.exists(SQL_RAM_DB_NAME):
+				# after a reboot: without a checkpoint at shutdown, files changed after the last checkpoint are resynced
+				copyFile(SQL_DB_NAME, SQL_RAM_DB_NAME)
+				if os.path.exists(SQL_DB_NAME + "-wal"):
+					# commits of a session without ram database which were not yet written back to the database file
+					copyFile(SQL_DB_NAME + "-wal", SQL_RAM_DB_NAME + "-wal")
+				resync_database = os.path.exists(SQL_CHECKPOINT_PENDING)
+			database_exists = os.path.exists(SQL_RAM_DB_NAME)
+			writeFile(SQL_CHECKPOINT_PENDING, "")
+			FileCacheSQL.__init__(self, SQL_RAM_DB_NAME, volatile=True, sort_articles=config.plugins.moviecockpit.list_sort_articles.value)
+			DelayTimer(self.__getCheckpointInterval(), self.__checkpointDatabase)
+		else:
+			# a ram database of a previous session is outdated as soon as this session changes the cache
+			for path in [SQL_RAM_DB_NAME, SQL_RAM_DB_NAME + "-wal", SQL_RAM_DB_NAME + "-shm"]:
+				if os.path.exists(path):
+					deleteFile(path)
+			FileCacheSQL.__init__(self, SQL_DB_NAME, sort_articles=config.plugins.moviecockpit.list_sort_articles.value)
+		self.row_cache = OrderedDict()
+		self.row_cache_hits = 0
+		self.row_cache_misses = 0
+		self.loader = None
+		self.bulk_list = []
+		self.load_shadow = False
+		self.load_chunked = False
+		self.load_full = False
+		self.load_dirs = []
+		self.load_changed_paths = set()
+		self.load_changed_trees = set()
+		self.populated_dirs = set(self.sqlSelectPopulatedDirs())
+		self.populate_queue = []
+		self.populate_visited = {}
+		self.dir_scans = {}
+		self.parser_cache = None
+		if self.sql_aggregates_created:
+			self.sqlRebuildAggregates(FILE_TYPE_FILE)
+			self.sqlCommit()
+		if self.sql_populated_dirs_created:
+			# the cache of previous versions is always loaded completely
+			self.__setPopulatedDirs(getBookmarks())
+			self.sqlCommit()
+		if not database_exists or reload_database:
 			print("MVC-I: FileCache: __init__: loading database...")
-			deleteFile("/etc/enigma2/.moviecockpit")
-			self.loadDatabase(sync=True)
+			if reload_database:
+				deleteFile("/etc/enigma2/.moviecockpit")
+			if config.plugins.moviecockpit.cache_lazy_load.value:
+				self.clearDatabase()
+				self.fillDatabase(getBookmarks())
+			elif database_exists:
+				# the previous content stays available while the rebuild is loaded in the background
+				self.loadDatabase()
+			else:
+				self.loadDatabase(sync=True)
+		elif resync_database:
+			print("MVC-I: FileCache: __init__: resyncing database from the last checkpoint...")
+			self.loadDatabase(resync=True)
 		else:
 			print("MVC-I: FileCache: __init__: database is already loaded.")
 
@@ -86,34 +192,76 @@ class FileCache(FileCacheSQL):
 
 	def add(self, filedata):
 		#print("MVC: FileCache: add: path: %s" % filedata[FILE_IDX_PATH])
+		# replace an existing row with the same path
+		self.__updateAggregates(self.getFile(filedata[FILE_IDX_PATH]), -1)
+		self.__updateAggregates(filedata, 1)
 		# add to SQL database
-		self.sqlInsert(filedata)
+		self.sqlUpsert(filedata)
+		self.__cacheRow(filedata[FILE_IDX_PATH], tuple(filedata[:FILE_IDX_TAGS + 1]))
+		self.__setLoadChanged(paths=[filedata[FILE_IDX_PATH]])
+
+	def __updateAggregates(self, filedata, sign):
+		# add (sign = 1) or remove (sign = -1) a file to/from the count and size of its parent directories
+		if filedata and filedata[FILE_IDX_TYPE] == FILE_TYPE_FILE:
+			self.sqlUpdateAggregates(filedata[FILE_IDX_DIR], sign, sign * filedata[FILE_IDX_SIZE])
 
 	### database row functions
 
 	def exists(self, path):
-		filedata = self.getFile(path)
-		return filedata is not None
+		return self.sqlExists(path)
 
 	def delete(self, path, filetype=FILE_TYPE_FILE):
 		#print("MVC: FileCache: delete %s" % path)
 		if filetype == FILE_TYPE_FILE:
-			where = "path = \"" + path + "\""
-			self.sqlDelete(where)
+			self.__updateAggregates(self.getFile(path), -1)
+			self.sqlDeleteFile(path)
+			self.__cacheRow(path, None)
+			self.__setLoadChanged(paths=[path])
 		elif filetype == FILE_TYPE_DIR:
-			self.loadDatabase(sync=True)
+			self.__deleteTree(os.path.normpath(path))
+			self.sqlCommit()
 
 	def update(self, path, **kwargs):
 		#print("MVC: FileCache: update: %s, kwargs: %s" % (path, kwargs))
-		filedata = self.getFile(path)
-		if filedata:
-			self.directory, self.filetype, self.path, self.filename, self.ext, self.name, self.event_start_time, self.recording_start_time, self.recording_stop_time, self.length, self.description, self.extended_description, self.service_reference, self.size, self.cuts, self.tags = filedata
-			#print("MVC: FileCache: update: kwargs.items(): %s" % kwargs.items())
-			for key, value in kwargs.items():
-				#print("MVC: FileCache: update: key: %s, value: %s" % (key, value))
-				setattr(self, key, value)
-			self.delete(path)
-			self.add((self.directory, self.filetype, self.path, self.filename, self.ext, self.name, self.event_start_time, self.recording_start_time, self.recording_stop_time, self.length, self.description, self.extended_description, self.service_reference, self.size, self.cuts, self.tags))
+		self.updateList([path], **kwargs)
+
+	def updateList(self, paths, **kwargs):
+		# update the columns in kwargs of all paths with a single statement
+		#print("MVC: FileCache: updateList: %s, kwargs: %s" % (paths, kwargs))
+		values = {}
+		for key, value in kwargs.items():
+			values[FILE_COLUMN_ALIASES.get(key, key)] = value
+		if self.sqlCheckUpdateColumns(values):
+			self.__setLoadChanged(paths=paths)
+			if "directory" in values or "filetype" in values or "size" in values:
+				old_filelist = [self.getFile(path) for path in paths]
+				for filedata in old_filelist:
+					self.__updateAggregates(filedata, -1)
+				self.sqlUpdate(paths, values, commit=False)
+				self.__uncacheRows(paths)
+				for filedata in old_filelist:
+					if filedata:
+						self.__updateAggregates(self.getFile(filedata[FILE_IDX_PATH]), 1)
+			else:
+				self.sqlUpdate(paths, values, commit=False)
+				self.__uncacheRows(paths)
+			if "cuts" in values:
+				self.__refreshSignatures(paths)
+			self.sqlCommit()
+
+	def __refreshSignatures(self, paths):
+		# the cuts are cached together with writing the .cuts files, so their new mtimes do not have to trigger a reload.
+		# a signature is only refreshed if the file itself is unchanged since it was cached
+		signatures = []
+		for path in paths:
+			signature = self.sqlSelectSignature(path)
+			try:
+				stat_signature = self.getStatSignature(path)
+			except OSError:
+				continue
+			if signature and tuple(signature) != stat_signature and tuple(signature[1:]) == stat_signature[1:]:
+				signatures.append((path, stat_signature))
+		self.sqlUpdateSignatures(signatures)
 
 	def copy(self, src_path, dest_path, filetype=FILE_TYPE_FILE):
 		if filetype == FILE_TYPE_FILE:
@@ -129,13 +277,14 @@ class FileCache(FileCacheSQL):
 				if dest_file is None:
 					#print("MVC: FileCache: copy: dest_path: %s" % path)
 					directory = dest_path
-					self.add((directory, filetype, path, filename, ext, name, event_start_time, recording_start_time, recording_stop_time, length, description, extended_description, service_reference, size, cuts, tags))
+					self.add((directory, filetype, path, filename, ext, name, event_start_time, recording_start_time, recording_stop_time, length, description, extended_description, service_reference, size, cuts, tags) + self.__getCopySignature(src_path, path))
 				else:
 					print("MVC-E: FileCache: copy: file already exists at destination")
 			else:
 				print("MVC-E: FileCache: copy: source file not found: src_path: %s" % src_path)
 		elif filetype == FILE_TYPE_DIR:
-			self.loadDatabase(sync=True)
+			src_path = os.path.normpath(src_path)
+			self.__moveTree(src_path, os.path.join(os.path.normpath(dest_path), os.path.basename(src_path)), copy=True)
 
 	def move(self, src_path, dest_path, filetype=FILE_TYPE_FILE):
 		if filetype == FILE_TYPE_FILE:
@@ -151,7 +300,7 @@ class FileCache(FileCacheSQL):
 				dest_file = self.getFile(path)
 				if dest_file is None:
 					#print("MVC: FileCache: move: dest_path: %s" % path)
-					self.add((directory, filetype, path, filename, ext, name, event_start_time, recording_start_time, recording_stop_time, length, description, extended_description, service_reference, size, cuts, tags))
+					self.add((directory, filetype, path, filename, ext, name, event_start_time, recording_start_time, recording_stop_time, length, description, extended_description, service_reference, size, cuts, tags) + self.__getCopySignature(src_path, path))
 					self.delete(src_path)
 				else:
 					print("MVC-E: FileCache: move: source file already exists at destination: %s" % src_path)
@@ -159,20 +308,45 @@ class FileCache(FileCacheSQL):
 			else:
 				print("MVC-E: FileCache: move: source file not found: src_path: %s" % src_path)
 		elif filetype == FILE_TYPE_DIR:
-			self.loadDatabase(sync=True)
+			src_path = os.path.normpath(src_path)
+			self.__moveTree(src_path, os.path.join(os.path.normpath(dest_path), os.path.basename(src_path)), copy=False)
 
 	def getFile(self, path):
-		where = "path = \"" + path + "\""
-		#print("MVC: FileCache: getFile: where: %s" % where)
-		filelist = self.sqlSelect(where)
-		filedata = None
-		if filelist:
-			if len(filelist) == 1:
-				filedata = filelist[0]
-			else:
-				print("MVC-E: FileCache: getFile: not a single response: " + str(filelist))
+		#print("MVC: FileCache: getFile: path: %s" % path)
+		if path in self.row_cache:
+			self.row_cache_hits += 1
+			filedata = self.row_cache.pop(path)
+			self.row_cache[path] = filedata
+		else:
+			self.row_cache_misses += 1
+			filedata = self.sqlSelectFile(path)
+			self.__cacheRow(path, filedata)
 		return filedata
 
+	def getListEntry(self, path):
+		# list row of path, e.g. for entries which are added to a list
+		return self.sqlSelectFile(path, SQL_LISTDATA)
+
+	### row cache functions
+
+	def __cacheRow(self, path, filedata):
+		# most recently used rows are at the end, None caches a missing file
+		self.row_cache.pop(path, None)
+		self.row_cache[path] = filedata
+		if len(self.row_cache) > ROW_CACHE_SIZE:
+			self.row_cache.popitem(last=False)
+
+	def __uncacheRows(self, paths):
+		for path in paths:
+			self.row_cache.pop(path, None)
+
+	def clearRowCache(self):
+		#print("MVC: FileCache: clearRowCache: hits: %s, misses: %s" % (self.row_cache_hits, self.row_cache_misses))
+		self.row_cache.clear()
+
+	def getRowCacheStats(self):
+		return self.row_cache_hits, self.row_cache_misses, len(self.row_cache)
+
 	def __resolveVirtualDirs(self, dirs):
 		#print("MVC: FileCache: __resolveVirtualDirs: dirs: %s" % dirs)
 		all_dirs = []
@@ -182,6 +356,9 @@ class FileCache(FileCacheSQL):
 				for bookmark in bookmarks:
 					if bookmark not in all_dirs:
 						all_dirs.append(bookmark)
+			elif adir.startswith(tuple(VIEW_DIRS)):
+				# views are no directories, their rows are selected by getSortedList()
+				pass
 			elif os.path.basename(adir) == "trashcan":
 				for bookmark in bookmarks:
 					trashcan_dir = bookmark + "/trashcan"
@@ -199,14 +376,8 @@ class FileCache(FileCacheSQL):
 		filelist = []
 		all_dirs = self.__resolveVirtualDirs(dirs)
 		if all_dirs:
-			where = "("
-			op = ""
-			for directory in all_dirs:
-				where += op + "directory = \"" + directory + "\""
-				op = " OR "
-			where += ") AND " + "filetype = " + str(FILE_TYPE_FILE)
-			#print("MVC: FileCache: getFileList: where: %s" % where)
-			filelist = self.sqlSelect(where)
+			self.__populateDirs(all_dirs)
+			filelist = self.sqlSelectFileList(all_dirs, FILE_TYPE_FILE, read=True, columns=SQL_LISTDATA)
 		return filelist
 
 	def getDirList(self, dirs):
@@ -214,95 +385,535 @@ class FileCache(FileCacheSQL):
 		dirlist = []
 		all_dirs = self.__resolveVirtualDirs(dirs)
 		if all_dirs:
-			where = "("
-			op = ""
-			for directory in all_dirs:
-				where += op + "directory = \"" + directory + "\""
-				op = " OR "
-			where += ")"
-			where += " AND " + "filename != \"trashcan\""
-			where += " AND " + "filename != \"..\""
-			where += " AND " + "filetype > " + str(FILE_TYPE_FILE)
-			#print("MVC: FileCache: getDirList: where: %s" % where)
-			dirlist = self.sqlSelect(where)
+			self.__populateDirs(all_dirs)
+			dirlist = self.sqlSelectDirList(all_dirs, FILE_TYPE_FILE, ["trashcan", ".."], read=True, columns=SQL_LISTDATA)
 		return dirlist
 
+	def getSortedList(self, dirs, sort_mode, with_dirs=True, dirs_first=True):
+		# key rows (LIST_IDX_DIR to LIST_IDX_NAME) of the files, and with_dirs of the dirs, in dirs sorted by sort_mode,
+		# or of the files of the view of a virtual dir (see VIEW_DIRS), the list rows of the visible entries are fetched by getListRows()
+		#print("MVC: FileCache: getSortedList: dirs: %s, sort_mode: %s" % (dirs, sort_mode))
+		filelist = []
+		if dirs and dirs[0].startswith(SEARCH_DIR):
+			filelist = self.__setViewDir(self.getSearchList(dirs[0][len(SEARCH_DIR):]), dirs[0])
+		elif dirs and dirs[0].startswith(TAG_DIR):
+			filelist = self.getTagList(dirs[0], sort_mode)
+		elif dirs and dirs[0] == LATEST_DIR:
+			filelist = self.getLatestList(sort_mode)
+		elif dirs and dirs[0] == UNWATCHED_DIR:
+			filelist = self.getUnwatchedList(sort_mode)
+		else:
+			all_dirs = self.__resolveVirtualDirs(dirs)
+			if all_dirs:
+				self.__populateDirs(all_dirs)
+				filelist = self.sqlSelectSortedList(all_dirs, FILE_TYPE_FILE, ["trashcan", ".."], with_dirs, dirs_first, sort_mode)
+		return filelist
+
+	def getSearchList(self, text, max_results=SEARCH_MAX_RESULTS):
+		# key rows (LIST_IDX_DIR to LIST_IDX_NAME) of the cached files below all bookmarks, except in the trashcans,
+		# whose name or descriptions contain words starting with the words of text, ranked by relevance
+		#print("MVC: FileCache: getSearchList: text: %s" % text)
+		bookmarks = getBookmarks()
+		return self.sqlSelectSearchList(text, bookmarks, self.__getTrashcanDirs(bookmarks), FILE_TYPE_FILE, max_results)
+
+	def getTagList(self, tag_dir, sort_mode):
+		# key rows of the cached files below all bookmarks, except in the trashcans, with the tag of the tag dir,
+		# sorted by sort_mode
+		#print("MVC: FileCache: getTagList: tag_dir: %s, sort_mode: %s" % (tag_dir, sort_mode))
+		bookmarks = getBookmarks()
+		filelist = self.sqlSelectTagList(tag_dir[len(TAG_DIR):], bookmarks, self.__getTrashcanDirs(bookmarks), FILE_TYPE_FILE, sort_mode)
+		return self.__setViewDir(filelist, tag_dir)
+
+	def getLatestList(self, sort_mode, count=LATEST_COUNT):
+		# key rows of the count newest cached files below all bookmarks, except in the trashcans, sorted by sort_mode
+		bookmarks = getBookmarks()
+		filelist = self.sqlSelectLatestList(bookmarks, self.__getTrashcanDirs(bookmarks), FILE_TYPE_FILE, sort_mode, count)
+		return self.__setViewDir(filelist, LATEST_DIR)
+
+	def getUnwatchedList(self, sort_mode):
+		# key rows of the cached files below all bookmarks, except in the trashcans, which were not played
+		# up to the watching percentage, sorted by sort_mode
+		bookmarks = getBookmarks()
+		max_progress = int(config.plugins.moviecockpit.movie_watching_percent.value)
+		filelist = self.sqlSelectUnwatchedList(bookmarks, self.__getTrashcanDirs(bookmarks), FILE_TYPE_FILE, sort_mode, max_progress)
+		return self.__setViewDir(filelist, UNWATCHED_DIR)
+
+	def __setViewDir(self, filelist, view_dir):
+		# the view dir stands in for the directory of the rows, so that reloads of the current dir repeat the view
+		return [(view_dir,) + tuple(entry[LIST_IDX_DIR + 1:]) for entry in filelist]
+
+	def getTags(self):
+		# (tag, count) of the tags of the cached files below all bookmarks, except in the trashcans
+		bookmarks = getBookmarks()
+		return self.sqlSelectTags(bookmarks, self.__getTrashcanDirs(bookmarks))
+
+	def __getTrashcanDirs(self, bookmarks):
+		return [bookmark + "/trashcan" for bookmark in bookmarks]
+
+	def updateSortKeys(self, sort_articles):
+		print("MVC-I: FileCache: updateSortKeys: sort_articles: %s" % sort_articles)
+		self.sqlUpdateSortKeys(sort_articles)
+
+	def getListRows(self, paths):
+		# list rows of paths by path
+		rows = {}
+		if paths:
+			for row in self.sqlSelectListRows(paths):
+				rows[row[LIST_IDX_PATH]] = row
+		return rows
+
+	### lazy load functions
+
+	def __populateDirs(self, dirs):
+		# load dirs which are accessed before the background fill got to them
+		if config.plugins.moviecockpit.cache_lazy_load.value and not self.isDatabaseLoadRunning():
+			for adir in dirs:
+				if adir not in self.populated_dirs and os.path.isdir(adir):
+					self.populateDir(adir)
+
+	def populateDir(self, adir):
+		# load the files and subdirs directly in adir, returns the subdirs
+		print("MVC-I: FileCache: populateDir: adir: %s" % adir)
+		load_list = self.getDirLoadList(adir, recursive=False)
+		filelist = []
+		loader = FileCacheLoader(self.__newScannedLoadData, int(config.plugins.moviecockpit.cache_load_workers.value))
+		loader.start(load_list)
+		while not loader.isDone():
+			for _path, _filetype, filedata, exception in loader.getResults(len(load_list), block=True):
+				if exception is None:
+					filelist.append(filedata)
+		loader.stop()
+		self.dir_scans = {}
+		subdirs = [path for path, filetype in load_list if filetype == FILE_TYPE_DIR and os.path.basename(path) != ".."]
+		for filedata in self.sqlSelectDirList([adir], FILE_TYPE_FILE, [".."]):
+			if filedata[FILE_IDX_PATH] not in subdirs:
+				self.__deleteTree(filedata[FILE_IDX_PATH])
+		old_count, old_size = self.__getFileListCountSize(self.sqlSelectFileList([adir], FILE_TYPE_FILE))
+		count, size = self.__getFileListCountSize(filelist)
+		self.sqlDeleteDirFiles(adir)
+		self.sqlInsertList(filelist)
+		if count != old_count or size != old_size:
+			self.sqlUpdateAggregates(adir, count - old_count, size - old_size)
+		self.sqlInsertPopulatedDirs([adir])
+		self.sqlCommit()
+		self.populated_dirs.add(adir)
+		self.clearRowCache()
+		return subdirs
+
+	def __getFileListCountSize(self, filelist):
+		filelist = [filedata for filedata in filelist if filedata[FILE_IDX_TYPE] == FILE_TYPE_FILE]
+		return len(filelist), sum([filedata[FILE_IDX_SIZE] for filedata in filelist])
+
+	def fillDatabase(self, dirs):
+		# populate dirs and all of their subdirs in the background
+		#print("MVC: FileCache: fillDatabase: dirs: %s" % dirs)
+		if not self.populate_queue:
+			self.populate_visited = {}
+			DelayTimer(100, self.__fillNextDir)
+		self.populate_queue += [adir for adir in dirs if adir not in self.populate_queue]
+
+	def __fillNextDir(self):
+		if self.populate_queue:
+			if not self.isDatabaseLoadRunning():
+				self.__openParserCache()
+				adir = self.populate_queue.pop(0)
+				# symlinks and bookmarks may lead to dirs which were visited already
+				try:
+					adir_stat = os.stat(adir)
+				except OSError:
+					adir_stat = None
+				if adir_stat and self.__visitPath(adir, adir_stat, self.populate_visited):
+					if adir in self.populated_dirs:
+						self.populate_queue += [filedata[FILE_IDX_PATH] for filedata in self.sqlSelectDirList([adir], FILE_TYPE_FILE, [".."])]
+					else:
+						try:
+							self.populate_queue += self.populateDir(adir)
+						except Exception as e:
+							print("MVC-E: FileCache: __fillNextDir: adir: %s, exception: %s" % (adir, e))
+							self.sqlRollback()
+			DelayTimer(10, self.__fillNextDir)
+		else:
+			print("MVC-I: FileCache: __fillNextDir: done.")
+			self.__closeParserCache()
+
+	def __setPopulatedDirs(self, dirs):
+		# no commit: dirs and all cached subdirs of dirs are completely loaded
+		populated_dirs = list(dirs) + self.sqlSelectSubDirs(dirs, FILE_TYPE_DIR)
+		self.sqlInsertPopulatedDirs(populated_dirs)
+		self.populated_dirs.update(populated_dirs)
+
+	def __deleteTree(self, path):
+		# no commit: remove path and everything below it from the cache
+		count, size = self.sqlSelectAggregate(path)
+		self.sqlUpdateAggregates(os.path.dirname(path), -count, -size)
+		self.sqlDeleteTree(path)
+		self.sqlDeletePopulatedTree(path)
+		self.__setLoadChanged(trees=[path])
+		self.populated_dirs = set([adir for adir in self.populated_dirs if adir != path and not adir.startswith(path + "/")])
+		self.clearRowCache()
+
+	def __moveTree(self, src_path, dest_path, copy):
+		# rewrite (or duplicate) the cached rows of src_path and everything below it to dest_path in one transaction,
+		# instead of loading dest_path from disk again
+		#print("MVC: FileCache: __moveTree: src_path: %s, dest_path: %s, copy: %s" % (src_path, dest_path, copy))
+		if self.exists(src_path):
+			count, size = self.sqlSelectAggregate(src_path)
+			self.__deleteTree(dest_path)
+			if not copy:
+				self.sqlUpdateAggregates(os.path.dirname(src_path), -count, -size)
+			self.sqlMoveTree(src_path, dest_path, copy)
+			self.__setLoadChanged(trees=[src_path, dest_path])
+			self.sqlUpdateAggregates(os.path.dirname(dest_path), count, size)
+			self.sqlCommit()
+			moved_dirs = [adir for adir in self.populated_dirs if adir == src_path or adir.startswith(src_path + "/")]
+			if not copy:
+				self.populated_dirs.difference_update(moved_dirs)
+			self.populated_dirs.update([dest_path + adir[len(src_path):] for adir in moved_dirs])
+			self.clearRowCache()
+			if config.plugins.moviecockpit.cache_lazy_load.value:
+				self.fillDatabase([dest_path])
+		else:
+			print("MVC-I: FileCache: __moveTree: not cached: %s" % src_path)
+			if not copy:
+				self.__deleteTree(src_path)
+			self.loadDatabaseDirs([dest_path], sync=True)
+
 	### utils
 
 	def getCountSize(self, path):
 		#print("MVC: FileCache: getCountSize: path: %s" % path)
-		self.count = self.size = 0
+		count = size = 0
 		dirs = self.__resolveVirtualDirs([path])
 		for adir in dirs:
-			self.__getCountSize(adir)
-		#print("MVC: FileCache: getCountSize: %s, %s" % (self.count, self.size))
-		return self.count, self.size
-
-	def __getCountSize(self, in_path):
-		#print("MVC: FileCache: __getCountSize: in_path: %s" % in_path)
-		where = "directory = \"" + in_path + "\""
-		#print("MVC: FileCache: __getCountSize: where: %s" % where)
-		filelist = self.sqlSelect(where)
-
-		for directory, filetype, path, filename, _ext, _name, _event_start_time, _recording_start_time, _recording_stop_time, _length, _description, _extended_description, _service_reference, size, _cuts, _tags in filelist:
-			#print("MVC: FileCache: __getCountSize: %s, %s" % (path, filetype))
-			if path and filetype == FILE_TYPE_FILE and directory == in_path:
-				#print("MVC: FileCache: __getCountSize: path: %s " % path)
-				self.count += 1
-				self.size += size
-			if path and filetype > FILE_TYPE_FILE and directory.startswith(in_path) and filename != "..":
-				self.__getCountSize(path)
-		#print("MVC: FileCache: __getCountSize: %s, %s, %s" % (in_path, self.count, self.size))
+			dir_count, dir_size = self.sqlSelectAggregate(adir, read=True)
+			count += dir_count
+			size += dir_size
+		#print("MVC: FileCache: getCountSize: %s, %s" % (count, size))
+		return count, size
 
 	### database functions
 
 	def closeDatabase(self):
 		#print("MVC: FileCache: closeDatabase")
+		print("MVC-I: FileCache: closeDatabase: row cache hits: %s, misses: %s" % (self.row_cache_hits, self.row_cache_misses))
+		self.clearRowCache()
+		if self.sql_in_ram:
+			self.sqlCommit()
+			if self.sqlCheckpoint(SQL_DB_NAME):
+				deleteFile(SQL_CHECKPOINT_PENDING)
+			# stops the checkpoint timer
+			self.sql_in_ram = False
 		self.sqlClose()
 
+	def __getCheckpointInterval(self):
+		return int(config.plugins.moviecockpit.cache_checkpoint_interval.value) * 60 * 1000
+
+	def __checkpointDatabase(self):
+		# copy the ram database to flash; a running load keeps its transaction open until it ends
+		if self.sql_in_ram:
+			if self.loader is None:
+				self.sqlCheckpoint(SQL_DB_NAME)
+			DelayTimer(self.__getCheckpointInterval(), self.__checkpointDatabase)
+
 	def clearDatabase(self):
 		#print("MVC: FileCache: clearDatabase")
+		self.clearRowCache()
 		self.sqlClearTable()
+		self.populated_dirs = set()
 
-	def loadDatabase(self, dirs=None, sync=False, callback=None):
-		#print("MVC: FileCache: loadDatabase: dirs: %s" % dirs)
-		if dirs is None:
-			dirs = getBookmarks()
-		if dirs:
-			self.clearDatabase()
-			self.load_list = self.getDirsLoadList(dirs)
-			if sync:
-				for path, filetype in self.load_list:
-					self.loadDatabaseFile(path, filetype)
-			else:
-				DelayTimer(10, self.nextFileOp, callback)
+	def loadDatabase(self, dirs=None, sync=False, callback=None, resync=False):
+		#print("MVC: FileCache: loadDatabase: dirs: %s, resync: %s" % (dirs, resync))
+		if resync:
+			# without dirs, cached files outside of the bookmarks are purged as well
+			load_list, purge_list = self.getDirsResyncList(dirs)
+			if not load_list and not purge_list:
+				# nothing changed, the callback is only called after a load
+				self.dir_scans = {}
+				return
+			self.beginDatabaseLoad(load_list, purge_list, shadow=not sync, dirs=dirs)
+		else:
+			if dirs is None:
+				dirs = getBookmarks()
+			if not dirs:
+				return
+			self.beginDatabaseLoad(self.getDirsLoadList(dirs), shadow=not sync, dirs=dirs)
+		if sync:
+			try:
+				while not self.isDatabaseLoadDone():
+					self.bulkLoadDatabaseFiles(block=True)
+				self.endDatabaseLoad()
+			except Exception as e:
+				print("MVC-E: FileCache: loadDatabase: exception: %s" % e)
+				self.cancelDatabaseLoad()
+		else:
+			DelayTimer(10, self.nextFileOp, callback, self.loader)
+
+	def loadDatabaseDirs(self, dirs, sync=False, callback=None):
+		# add the dir rows of dirs and load their content, in lazy mode in the background
+		for adir in dirs:
+			self.__deleteTree(adir)
+			self.loadDatabaseFile(adir, FILE_TYPE_DIR)
+		if config.plugins.moviecockpit.cache_lazy_load.value:
+			self.fillDatabase(dirs)
+		else:
+			self.loadDatabase(dirs, sync=sync, callback=callback, resync=True)
 
-	def nextFileOp(self, callback):
+	def nextFileOp(self, callback, loader=None):
 		#print("MVC: FileCache: nextFileOp")
-		if self.load_list:
-			path, filetype = self.load_list.pop(0)
-			self.loadDatabaseFile(path, filetype)
-			DelayTimer(10, self.nextFileOp, callback)
+		if loader is not None and loader is not self.loader:
+			# the load was cancelled by another load
+			if callback:
+				callback()
+			return
+		if not self.isDatabaseLoadDone():
+			try:
+				self.bulkLoadDatabaseFiles(time_budget=self.getLoadTimeBudget())
+			except Exception as e:
+				print("MVC-E: FileCache: nextFileOp: exception: %s" % e)
+				self.cancelDatabaseLoad()
+				if callback:
+					callback()
+				return
+			DelayTimer(10, self.nextFileOp, callback, loader)
 		else:
 			#print("MVC: FileCache: nextFileOp: done.")
+			self.endDatabaseLoad()
 			if callback:
 				callback()
 
+	### database bulk load functions
+
+	def beginDatabaseLoad(self, load_list, purge_list=None, shadow=True, dirs=None):
+		# clearing the table (or purging the given paths) and inserting all files is done in one transaction,
+		# so that a rebuild is either committed completely or not at all.
+		# with shadow, the cache can still be read while loading: a rebuild is loaded into a shadow table,
+		# a resync (with purge_list) is applied in place and committed in chunks.
+		# the files of load_list are read and parsed by worker threads, bulkLoadDatabaseFiles() inserts the results.
+		# dirs (default: bookmarks) are the dirs which are completely loaded by load_list and purge_list
+		#print("MVC: FileCache: beginDatabaseLoad")
+		if self.isDatabaseLoadRunning():
+			# a running load is cancelled cleanly, the dir scans of the new load list are kept
+			print("MVC-I: FileCache: beginDatabaseLoad: cancelling the running load")
+			dir_scans = self.dir_scans
+			self.cancelDatabaseLoad()
+			self.dir_scans = dir_scans
+		self.bulk_list = []
+		self.load_full = purge_list is None
+		self.load_shadow = shadow and self.load_full
+		self.load_chunked = shadow and not self.load_full
+		self.load_dirs = dirs if dirs is not None else getBookmarks()
+		self.load_changed_paths = set()
+		self.load_changed_trees = set()
+		self.clearRowCache()
+		if load_list:
+			self.__openParserCache()
+		if self.load_shadow:
+			self.sqlBeginShadowTable()
+		elif self.load_full:
+			self.sqlClearTable(commit=False)
+		if purge_list:
+			if self.load_chunked:
+				self.__updateListAggregates(purge_list, -1)
+			self.sqlDeleteList(purge_list)
+			if self.load_chunked:
+				self.sqlCommit()
+		self.loader = FileCacheLoader(self.__newScannedLoadData, int(config.plugins.moviecockpit.cache_load_workers.value))
+		self.loader.start(load_list)
+
+	def isDatabaseLoadDone(self):
+		return self.loader is None or self.loader.isDone()
+
+	def isDatabaseLoadRunning(self):
+		# a load is running from beginDatabaseLoad() until it is ended or cancelled, even when all files are loaded
+		return self.loader is not None
+
+	def getLoadTimeBudget(self):
+		# seconds an asynchronous load may spend per timer tick, before the GUI gets its turn again
+		return int(config.plugins.moviecockpit.cache_load_time_budget.value) / 1000.0
+
+	def bulkLoadDatabaseFiles(self, block=False, time_budget=0):
+		# inserts the files loaded by the worker threads so far and returns their (path, filetype) list;
+		# raises the exception of a file that could not be loaded.
+		# with a time_budget (seconds), results are waited for and inserted until the budget is used up
+		chunk_size = int(config.plugins.moviecockpit.cache_load_chunk_size.value)
+		loaded_list = []
+		end_time = time.time() + time_budget
+		while True:
+			timeout = end_time - time.time()
+			results = self.loader.getResults(chunk_size, block or timeout > 0, None if block else timeout)
+			for path, filetype, filedata, exception in results:
+				#print("MVC: FileCache: bulkLoadDatabaseFiles: path: %s, filetype: %s" % (path, filetype))
+				if exception:
+					raise exception
+				self.bulk_list.append(filedata)
+				if len(self.bulk_list) >= chunk_size:
+					if not self.load_shadow:
+						self.clearRowCache()
+					self.__insertBulkList()
+				loaded_list.append((path, filetype))
+			if block or not results or time.time() >= end_time:
+				break
+		return loaded_list
+
+	def endDatabaseLoad(self):
+		#print("MVC: FileCache: endDatabaseLoad")
+		if not self.isDatabaseLoadRunning():
+			# the load was cancelled by another load
+			return
+		self.__stopLoader()
+		self.clearRowCache()
+		self.__insertBulkList()
+		if self.load_shadow:
+			# the rows which were changed while loading are taken over from the recordings table
+			self.sqlCopyToShadowTable(self.load_changed_paths, self.load_changed_trees)
+			self.sqlSwapShadowTable(FILE_TYPE_FILE)
+		elif not self.load_chunked:
+			# the aggregates of a chunked resync are committed with each chunk
+			self.sqlRebuildAggregates(FILE_TYPE_FILE)
+		if self.load_full:
+			self.sqlClearPopulatedDirs()
+			self.populated_dirs = set()
+		self.__setPopulatedDirs(self.load_dirs)
+		self.sqlCommit()
+		self.dir_scans = {}
+		self.load_changed_paths = set()
+		self.load_changed_trees = set()
+		self.__closeParserCache(prune=self.load_full)
+
+	def cancelDatabaseLoad(self):
+		if not self.isDatabaseLoadRunning():
+			return
+		print("MVC-I: FileCache: cancelDatabaseLoad: restoring previous database content")
+		self.__stopLoader()
+		self.bulk_list = []
+		self.dir_scans = {}
+		self.load_changed_paths = set()
+		self.load_changed_trees = set()
+		self.clearRowCache()
+		if self.load_shadow:
+			self.sqlDropShadowTable()
+		else:
+			# the chunks of a resync which are already committed are kept together with their aggregates
+			self.sqlRollback()
+		self.__closeParserCache()
+
+	def __insertBulkList(self):
+		# the results of files which were changed while loading are dropped, as the changes are newer
+		filelist = [filedata for filedata in self.bulk_list if not self.__isLoadChanged(filedata[FILE_IDX_PATH])]
+		self.bulk_list = []
+		if self.load_chunked:
+			# each chunk replaces its rows together with their aggregates,
+			# so that the committed content stays consistent when the resync is interrupted
+			paths = [filedata[FILE_IDX_PATH] for filedata in filelist]
+			self.__updateListAggregates(paths, -1)
+			self.sqlInsertList(filelist)
+			self.__updateListAggregates(paths, 1)
+			self.sqlCommit()
+		else:
+			self.sqlInsertList(filelist)
+
+	def __updateListAggregates(self, paths, sign):
+		# add (sign = 1) or remove (sign = -1) the cached files of paths to/from the aggregates
+		for directory, count, size in self.sqlSelectDirAggregates(paths, FILE_TYPE_FILE):
+			self.sqlUpdateAggregates(directory, sign * count, sign * size)
+
+	def __setLoadChanged(self, paths=None, trees=None):
+		# remember the paths and trees (dirs with everything below them) which are changed while a load is running
+		if self.loader:
+			self.load_changed_paths.update(paths or [])
+			self.load_changed_trees.update(trees or [])
+
+	def __isLoadChanged(self, path):
+		if path in self.load_changed_paths:
+			return True
+		for tree in self.load_changed_trees:
+			if path == tree or path.startswith(tree + "/"):
+				return True
+		return False
+
+	def __stopLoader(self):
+		if self.loader:
+			self.loader.stop()
+			self.loader = None
+
+	def __openParserCache(self):
+		# the parser cache is only open while files are loaded
+		if self.parser_cache is None:
+			self.parser_cache = ParserCache(self.sql_db_name)
+
+	def __closeParserCache(self, prune=False):
+		# writes the new entries of the parser cache in a transaction of its own,
+		# with prune, only the entries which were used since the parser cache was opened are kept
+		if self.parser_cache:
+			rows = self.parser_cache.getChangedRows()
+			self.sqlUpsertParserCache(rows)
+			if prune:
+				self.sqlPruneParserCache(self.parser_cache.getUsedPaths())
+			self.sqlCommit()
+			print("MVC-I: FileCache: __closeParserCache: new entries: %s" % len(rows))
+			if not self.populate_queue:
+				self.parser_cache.close()
+				self.parser_cache = None
+
 	### database load file/dir functions
 
 	def reloadDatabaseFile(self, path, filetype=FILE_TYPE_FILE):
-		where = "path = \"" + path + "\""
-		self.sqlDelete(where)
+		# the new row replaces the cached row of path
 		self.loadDatabaseFile(path, filetype)
 
 	def loadDatabaseFile(self, path, filetype=FILE_TYPE_FILE):
 		#print("MVC: FileCache: loadDatabaseFile: path: %s, filetype: %s" % (path, filetype))
+		self.add(self.newLoadData(path, filetype))
+
+	def newLoadData(self, path, filetype=FILE_TYPE_FILE, dir_scan=None):
+		# complete row of a file or dir, called by the FileCacheLoader worker threads
 		if filetype == FILE_TYPE_FILE:
-			filedata = self.newFileData(path)
-			self.sqlInsert(filedata)
-		elif filetype == FILE_TYPE_DIR:
+			filedata = self.newFileData(path, dir_scan)
+		else:
 			filedata = self.newDirData(path)
-			self.sqlInsert(filedata)
+		return filedata + self.getStatSignature(path, filetype, dir_scan)
+
+	def __newScannedLoadData(self, path, filetype=FILE_TYPE_FILE):
+		return self.newLoadData(path, filetype, self.__getDirScan(path))
+
+	def __getDirScan(self, path):
+		# (dir names, stat) of a file which was found by the current load list walk, or None
+		dir_scan = self.dir_scans.get(os.path.dirname(path))
+		if dir_scan:
+			dir_names, stats = dir_scan
+			path_stat = stats.get(os.path.basename(path))
+			if path_stat:
+				return dir_names, path_stat
+		return None
+
+	def getStatSignature(self, path, filetype=FILE_TYPE_FILE, dir_scan=None):
+		# (mtime, size, inode) of a file; mtime also covers the sidecar files,
+		# so that changed cuts, meta or eit files trigger a reload as well
+		dir_names, stat = dir_scan or (None, None)
+		if stat is None:
+			stat = os.stat(path)
+		mtime = int(stat.st_mtime)
+		if filetype == FILE_TYPE_FILE:
+			for sidecar_path in [path + ".cuts", path + ".meta", path + ".xmeta", os.path.splitext(path)[0] + ".eit"]:
+				if dir_names is not None and os.path.basename(sidecar_path) not in dir_names:
+					continue
+				try:
+					mtime = max(mtime, int(os.stat(sidecar_path).st_mtime))
+				except OSError:
+					pass
+		return (mtime, int(stat.st_size), int(stat.st_ino))
+
+	def __getCopySignature(self, src_path, dest_path):
+		# the stat signature of a moved or copied file, or the one of its source if the file is not there yet,
+		# so that the cached row is not taken as changed by the next resync
+		try:
+			return self.getStatSignature(dest_path)
+		except OSError:
+			return tuple(self.sqlSelectSignature(src_path) or (0, 0, 0))
+
+	def hasFileChanged(self, path, filetype=FILE_TYPE_FILE):
+		# True if path is not cached yet, or if it was changed since it was cached
+		return self.sqlSelectSignature(path) != self.getStatSignature(path, filetype)
 
 	def newDirData(self, path):
 		ext, short_description, extended_description, service_reference, cuts, tags = "", "", "", "", "", ""
@@ -311,7 +922,7 @@ class FileCache(FileCacheSQL):
 		name = convertToUtf8(os.path.basename(path))
 		return (os.path.dirname(path), FILE_TYPE_DIR, path, os.path.basename(path), ext, name, event_start_time, recording_start_time, recording_stop_time, length, short_description, extended_description, service_reference, size, cuts, tags)
 
-	def newFileData(self, path):
+	def newFileData(self, path, dir_scan=None):
 
 		def parseFilename(filename):
 			#print("MVC: FileCache: parseFilename: filename: %s" % filename)
@@ -397,18 +1008,28 @@ class FileCache(FileCacheSQL):
 		name = filename
 		short_description, extended_description, service_reference, tags = "", "", "", ""
 		recording_start_time = recording_stop_time = length = size = 0
-		cuts = readFile(path + ".cuts")
-		event_start_time = int(os.stat(path).st_ctime)
-		size = os.path.getsize(path)
+		dir_names, path_stat = dir_scan or (None, None)
+		if dir_names is None or os.path.basename(path) + ".cuts" in dir_names:
+			cuts = readFile(path + ".cuts")
+		else:
+			cuts = ""
+		if path_stat is None:
+			path_stat = os.stat(path)
+		event_start_time = int(path_stat.st_ctime)
+		size = path_stat.st_size
 
 		if ext in EXT_TS:
 			start_time, _service_name, name, cutno = parseFilename(filename)
 			#print("MVC: FileCache: newFileData: start_time: %s, service_name: %s, filename: %s, cutno: %s" % (start_time, _service_name, filename, cutno))
 			if start_time:
 				event_start_time = start_time
-			meta = ParserMetaFile(path).getMeta()
+			parser_cache = self.parser_cache
+			if parser_cache:
+				meta, eit = parser_cache.getMetaEit(path, dir_names, path_stat)
+			else:
+				meta = ParserMetaFile(path, dir_names, path_stat).getMeta()
+				eit = ParserEitFile(path, dir_names, path_stat).getEit()
 			meta_name = meta["name"]
-			eit = ParserEitFile(path).getEit()
 			eit_name = eit["name"]
 
 			if eit_name and meta_name:
@@ -436,30 +1057,74 @@ class FileCache(FileCacheSQL):
 
 	### database load list functions
 
-	def __getDirLoadList(self, adir):
+	def getDirLoadList(self, adir, recursive=True, visited=None):
 		#print("MVC: FileCache: getDirLoadList: adir: %s" % adir)
+		# a single read of each dir, whose entry names and video file stats are kept in dir_scans
+		# for the parsers and signatures of the following load.
+		# visited maps the (device, inode) of the dirs and files walked so far to their paths,
+		# so that symlink loops end and files which are reachable by several paths are loaded only once
 		load_list = []
-		if os.path.exists(adir):
-			walk_listdir = os.listdir(adir)
-			for walk_name in walk_listdir:
-				path = os.path.join(adir, walk_name)
-				if os.path.islink(path):
-					path = os.path.realpath(path)
-				if os.path.isfile(path):
-					_filename, ext = os.path.splitext(path)
-					if ext in EXT_VIDEO:
-						load_list.append((path, FILE_TYPE_FILE))
-				elif os.path.isdir(path):
+		if visited is None:
+			visited = {}
+		try:
+			if not self.__visitPath(adir, os.stat(adir), visited):
+				return load_list
+			dir_names, files, dirs = scanDir(adir, EXT_VIDEO, config.plugins.moviecockpit.cache_follow_symlinks.value)
+		except OSError as e:
+			print("MVC-E: FileCache: getDirLoadList: adir: %s, exception: %s" % (adir, e))
+			return load_list
+		stats = {}
+		for path, path_stat in files:
+			if self.__visitPath(path, path_stat, visited):
+				load_list.append((path, FILE_TYPE_FILE))
+				if os.path.dirname(path) == adir:
+					stats[os.path.basename(path)] = path_stat
+		self.dir_scans[adir] = (dir_names, stats)
+		for path in dirs:
+			if recursive:
+				dir_load_list = self.getDirLoadList(path, True, visited)
+				if dir_load_list:
 					load_list.append((path, FILE_TYPE_DIR))
-					load_list += self.__getDirLoadList(path)
-			load_list.append((os.path.join(adir, ".."), FILE_TYPE_DIR))
-		else:
-			print("MVC-E: FileCache: __getDirLoadList: adir: %s" % adir)
+					load_list += dir_load_list
+			elif (adir + "/").startswith(path + "/"):
+				print("MVC-I: FileCache: getDirLoadList: symlink loop: %s, in: %s" % (path, adir))
+			else:
+				load_list.append((path, FILE_TYPE_DIR))
+		load_list.append((os.path.join(adir, ".."), FILE_TYPE_DIR))
 		return load_list
 
+	def __visitPath(self, path, path_stat, visited):
+		# False if the physical file or dir of path was walked before
+		key = (path_stat.st_dev, path_stat.st_ino)
+		if key in visited:
+			print("MVC-I: FileCache: __visitPath: duplicate: %s, of: %s" % (path, visited[key]))
+			return False
+		visited[key] = path
+		return True
+
 	def getDirsLoadList(self, dirs):
 		#print("MVC: FileCache: getDirsLoadList: dirs: %s" % dirs)
 		load_list = []
+		visited = {}
 		for adir in dirs:
-			load_list += self.__getDirLoadList(adir)
+			load_list += self.getDirLoadList(adir, visited=visited)
 		return load_list
+
+	def getDirsResyncList(self, dirs=None):
+		# returns the load list entries which are new or have changed since they were cached,
+		# and the paths of cached files which do not exist anymore
+		#print("MVC: FileCache: getDirsResyncList: dirs: %s" % dirs)
+		signatures = {}
+		for path, mtime, size, inode in self.sqlSelectSignatures(dirs):
+			signatures[path] = (mtime, size, inode)
+		load_list = []
+		for path, filetype in self.getDirsLoadList(dirs if dirs is not None else getBookmarks()):
+			signature = signatures.pop(path, None)
+			try:
+				if signature != self.getStatSignature(path, filetype, self.__getDirScan(path)):
+					load_list.append((path, filetype))
+			except OSError as e:
+				print("MVC-E: FileCache: getDirsResyncList: path: %s, exception: %s" % (path, e))
+		purge_list = list(signatures.keys())
+		print("MVC-I: FileCache: getDirsResyncList: changed: %s, removed: %s" % (len(load_list), len(purge_list)))
+		return load_list, purge_list
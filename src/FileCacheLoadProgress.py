@@ -20,7 +20,9 @@
 
 
 import os
+import time
 from __init__ import _
+from Components.config import config
 from Bookmarks import getBookmarks
 from DelayTimer import DelayTimer
 from FileCache import FileCache
@@ -35,6 +37,8 @@ class FileCacheLoadProgress(FileProgress):
 		self.skinName = "MVCFileCacheLoadProgress"
 		self.setTitle(_("File cache reload") + " ...")
 		self.execution_list = []
+		self.load_pending = False
+		self.load_start_time = 0
 		self.onShow.append(self.onDialogShow)
 
 	def onDialogShow(self):
@@ -42,18 +46,62 @@ class FileCacheLoadProgress(FileProgress):
 		DelayTimer(10, self.execFileCacheLoadProgress)
 
 	def doFileOp(self, entry):
-		path, filetype = entry
-		self.file_name = os.path.basename(path)
-		self.status = _("Please wait") + " ..."
-		self.updateProgress()
-		FileCache.getInstance().loadDatabaseFile(path, filetype)
-		DelayTimer(10, self.nextFileOp)
+		# the files are loaded by the worker threads in any order, so the entry popped by nextFileOp
+		# just stands for one of them; the results loaded within the time budget are inserted at once
+		try:
+			loaded_list = FileCache.getInstance().bulkLoadDatabaseFiles(time_budget=FileCache.getInstance().getLoadTimeBudget())
+		except Exception as e:
+			print("MVC-E: FileCacheLoadProgress: doFileOp: exception: %s" % e)
+			self.request_cancel = True
+			DelayTimer(10, self.nextFileOp)
+			return
+		if loaded_list:
+			self.current_files += len(loaded_list) - 1
+			del self.execution_list[:len(loaded_list) - 1]
+			self.file_name = os.path.basename(loaded_list[-1][0])
+			files_per_second = int(self.current_files / max(time.time() - self.load_start_time, 0.001))
+			self.status = _("Please wait") + " ... " + _("%s files/s") % files_per_second
+			self.updateProgress()
+			DelayTimer(10, self.nextFileOp)
+		elif FileCache.getInstance().isDatabaseLoadDone():
+			# all results are inserted, the remaining entries of the execution list stand for no more files
+			self.current_files = self.total_files
+			self.execution_list = []
+			DelayTimer(10, self.nextFileOp)
+		else:
+			DelayTimer(10, self.doFileOp, entry)
+
+	def nextFileOp(self):
+		FileProgress.nextFileOp(self)
+		if self.load_pending:
+			if self.cancelled:
+				self.load_pending = False
+				FileCache.getInstance().cancelDatabaseLoad()
+			elif self.current_files > self.total_files:
+				self.load_pending = False
+				FileCache.getInstance().endDatabaseLoad()
 
 	def execFileCacheLoadProgress(self):
+		if FileCache.getInstance().isDatabaseLoadRunning():
+			# a second load would take over the loader of the running one, so wait until it has ended
+			if self.request_cancel:
+				self.cancelled = True
+				self.nextFileOp()
+			else:
+				self.status = _("Waiting for the running cache load") + " ..."
+				self.updateProgress()
+				DelayTimer(1000, self.execFileCacheLoadProgress)
+			return
 		print("MVC-I: FileCacheLoadProgress: execFileCacheLoadProgress")
 		self.status = _("Initializing") + " ..."
 		self.updateProgress()
-		FileCache.getInstance().clearDatabase()
-		self.execution_list = FileCache.getInstance().getDirsLoadList(getBookmarks())
+		if config.plugins.moviecockpit.cache_reload_incremental.value:
+			self.execution_list, purge_list = FileCache.getInstance().getDirsResyncList()
+			FileCache.getInstance().beginDatabaseLoad(self.execution_list, purge_list)
+		else:
+			self.execution_list = FileCache.getInstance().getDirsLoadList(getBookmarks())
+			FileCache.getInstance().beginDatabaseLoad(self.execution_list)
+		self.load_pending = True
+		self.load_start_time = time.time()
 		self.total_files = len(self.execution_list)
 		DelayTimer(10, self.nextFileOp)
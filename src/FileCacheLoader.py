@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# coding=utf-8
+#
+# Copyright (C) 2018-2020 by dream-alpha
+#
+# In case of reuse of this source code please do not remove this copyright.
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	For more information on the GNU General Public License see:
+#	<http://www.gnu.org/licenses/>.
+
+
+
+from threading import Thread
+from Queue import Queue, Empty
+# importing _strptime for the first time in a worker thread (by datetime.strptime) is not thread safe in python 2
+import _strptime  # pylint: disable=W0611
+
+
+class FileCacheLoader():
+
+	def __init__(self, load_function, workers):
+		# load_function(path, filetype) is called in the worker threads and must not use the connections of the cache database
+		print("MVC-I: FileCacheLoader: __init__: workers: %s" % workers)
+		self.load_function = load_function
+		self.workers = workers
+		self.load_queue = Queue()
+		self.result_queue = Queue()
+		self.threads = []
+		self.pending = 0
+		self.stopped = False
+
+	def start(self, load_list):
+		self.pending = len(load_list)
+		for entry in load_list:
+			self.load_queue.put(entry)
+		for _i in range(min(self.workers, len(load_list))):
+			thread = Thread(target=self.__work)
+			thread.daemon = True
+			thread.start()
+			self.threads.append(thread)
+
+	def stop(self):
+		#print("MVC: FileCacheLoader: stop")
+		self.stopped = True
+		for thread in self.threads:
+			thread.join()
+		self.threads = []
+		self.pending = 0
+
+	def __work(self):
+		while not self.stopped:
+			try:
+				path, filetype = self.load_queue.get_nowait()
+			except Empty:
+				break
+			try:
+				self.result_queue.put((path, filetype, self.load_function(path, filetype), None))
+			except Exception as e:
+				print("MVC-E: FileCacheLoader: __work: path: %s, exception: %s" % (path, e))
+				self.result_queue.put((path, filetype, None, e))
+
+	def isDone(self):
+		return self.pending == 0
+
+	def getResults(self, max_results, block=False, timeout=None):
+		# returns up to max_results finished (path, filetype, data, exception) tuples in completion order,
+		# waits for at least one result if block is set, at most timeout seconds if given
+		results = []
+		while self.pending and len(results) < max_results:
+			try:
+				results.append(self.result_queue.get(block and not results, timeout))
+			except Empty:
+				break
+			self.pending -= 1
+		return results
@@ -19,46 +19,805 @@
 #	<http://www.gnu.org/licenses/>.
 
 
+import os
+import re
+import shutil
+import struct
 from sqlite3 import dbapi2 as sqlite
+from CutListUtils import unpackCutList, getCutListProgress
+from UnicodeUtils import getSortKey
+
+
+# recordings table columns: the first 16 columns make up the filedata tuple (see FILE_IDX_* in FileCache),
+# the stat_* columns hold the stat signature of a file and are only used to detect changes,
+# the derived columns are computed whenever a row is written: progress from cuts and length, so that list rows
+# do not need the cuts, and sort_key from name, so that the database sorts by name with an index
+SQL_COLUMNS_RECORDINGS = [
+	("directory", "TEXT"),
+	("filetype", "INTEGER"),
+	("path", "TEXT PRIMARY KEY"),
+	("fileName", "TEXT"),
+	("fileExt", "TEXT"),
+	("name", "TEXT"),
+	("event_start_time", "INTEGER"),
+	("recording_start_time", "INTEGER"),
+	("recording_stop_time", "INTEGER"),
+	("length", "INTEGER"),
+	("description", "TEXT"),
+	("extended_description", "TEXT"),
+	("service_reference", "TEXT"),
+	("size", "INTEGER"),
+	("cuts", "TEXT"),
+	("tags", "TEXT"),
+	("stat_mtime", "INTEGER DEFAULT 0"),
+	("stat_size", "INTEGER DEFAULT 0"),
+	("stat_inode", "INTEGER DEFAULT 0"),
+	("progress", "INTEGER DEFAULT 0"),
+	("sort_key", "TEXT DEFAULT ''"),
+]
+
+SQL_DERIVED_COLUMNS = ["progress", "sort_key"]
+
+SQL_FILEDATA_SIZE = 16
+SQL_IDX_PATH = 2
+SQL_IDX_NAME = 5
+SQL_IDX_LENGTH = 9
+SQL_IDX_CUTS = 14
+SQL_IDX_TAGS = 15
+
+SQL_TABLE_RECORDINGS = ", ".join([name + " " + sql_type for name, sql_type in SQL_COLUMNS_RECORDINGS])
+SQL_FILEDATA = ", ".join([name for name, _sql_type in SQL_COLUMNS_RECORDINGS[:SQL_FILEDATA_SIZE]])
+SQL_COLUMNS = ", ".join([name for name, _sql_type in SQL_COLUMNS_RECORDINGS])
+
+# columns of the rows shown by the movie list (see LIST_IDX_* in FileCache), the descriptions and cuts
+# are only read with the complete filedata of a single file
+SQL_LISTDATA = "directory, filetype, path, fileName, fileExt, name, event_start_time, length, description, service_reference, size, tags, progress"
+# columns which the list rows start with, sufficient to identify and sort an entry
+SQL_KEYDATA = "directory, filetype, path, fileName, fileExt, name"
+
+# ORDER BY terms of the sort modes (see sort_modes in ConfigInit)
+SQL_SORT_ORDERS = {
+	("date", False): "event_start_time DESC, sort_key DESC",
+	("date", True): "event_start_time, sort_key",
+	("alpha", False): "sort_key, event_start_time DESC",
+	("alpha", True): "sort_key DESC, event_start_time DESC",
+}
+
+# columns which may be changed by sqlUpdate, path is the key of a row
+SQL_UPDATE_COLUMNS = [name for name, _sql_type in SQL_COLUMNS_RECORDINGS[:SQL_FILEDATA_SIZE] if name != "path"]
+
+# recursive file count and size of each directory, maintained together with the recordings table
+SQL_TABLE_AGGREGATES = "directory TEXT PRIMARY KEY, count INTEGER, size INTEGER"
+
+# directories whose files and subdirs are loaded, other directories are loaded on first access
+SQL_TABLE_POPULATED_DIRS = "directory TEXT PRIMARY KEY"
+
+# each tag of the space separated tags of the rows of the recordings table, so that tags are looked up by index.
+# Rows are added together with the recordings rows, the triggers of the recordings table follow deletes and moves
+SQL_TABLE_TAGS = "tag TEXT, path TEXT, PRIMARY KEY (tag, path)"
+SQL_INDEXES_TAGS = [
+	"CREATE INDEX IF NOT EXISTS tags_path ON tags (path)",
+]
+SQL_TRIGGERS_TAGS = [
+	"CREATE TRIGGER recordings_tags_delete AFTER DELETE ON recordings BEGIN DELETE FROM tags WHERE path = old.path; END",
+	"CREATE TRIGGER recordings_tags_move AFTER UPDATE OF path ON recordings BEGIN UPDATE tags SET path = new.path WHERE path = old.path; END",
+]
+
+# meta and eit dicts of the parsers with the signature of the files they were parsed from, pickled (see ParserCache).
+# The table is not cleared with the recordings, so that a rebuild of the cache does not parse all files again
+SQL_TABLE_PARSER_CACHE = "path TEXT PRIMARY KEY, signature BLOB, meta BLOB, eit BLOB"
+
+# single row with the schema version of the database
+SQL_TABLE_SCHEMA_VERSION = "version INTEGER"
+
+# increase for every schema change and add the step which migrates the previous version to __sqlMigrate
+SQL_SCHEMA_VERSION = 9
+
+# rebuilds running in the background are written to the shadow table, which replaces the recordings table when complete
+SQL_SHADOW_TABLE = "recordings_shadow"
+
+# (directory, filetype) also serves lookups on directory alone,
+# (directory, sort_key, event_start_time) returns the rows of a directory in alpha sort order,
+# the other SQL_KEYDATA columns make it cover sqlSelectSortedList() without reading the rows,
+# (filetype, event_start_time) returns the files of all dirs newest first for the latest view,
+# (filetype, progress) the files of all dirs which are not watched yet for the unwatched view
+SQL_INDEXES_RECORDINGS = [
+	"CREATE INDEX IF NOT EXISTS recordings_directory_filetype ON recordings (directory, filetype)",
+	"CREATE INDEX IF NOT EXISTS recordings_directory_sort_key ON recordings (directory, sort_key, event_start_time, filetype, path, fileName, fileExt, name)",
+	"CREATE INDEX IF NOT EXISTS recordings_filetype_event_start_time ON recordings (filetype, event_start_time)",
+	"CREATE INDEX IF NOT EXISTS recordings_filetype_progress ON recordings (filetype, progress)",
+]
+
+# full-text index of the names and descriptions of a recordings table, its docids are the rowids of the table.
+# It is kept up to date by the triggers of the table, so that every change of a row reaches the index
+SQL_FTS_COLUMNS = ["name", "description", "extended_description"]
+# weights of the hits in the SQL_FTS_COLUMNS when ranking search results
+SQL_FTS_WEIGHTS = [10.0, 3.0, 1.0]
+# words of search texts with fewer characters only match whole words, as short prefixes match almost every row
+SQL_FTS_PREFIX_MIN = 3
+# unicode61 folds case and accents of all scripts, simple only the case of ascii, but comes with every fts4
+SQL_FTS_TOKENIZERS = ["unicode61", "simple"]
+
+# number of prepared statements kept by the connection for reuse
+SQL_CACHED_STATEMENTS = 100
+# number of paths bound to a single statement, below the SQLite default limit of 999 parameters
+SQL_MAX_PATH_PARAMETERS = 500
+
+
+def sqlParameters(values):
+	# placeholders for binding a list of values, e.g. to an IN (...) clause
+	return ",".join(["?"] * len(values))
+
+
+def sqlProgress(cuts, length):
+	return getCutListProgress(unpackCutList(cuts), length)
+
+
+def sqlRowColumns(size):
+	# columns of a row of size values returned by sqlRow() or of a complete row
+	return [name for name, _sql_type in SQL_COLUMNS_RECORDINGS[:size - len(SQL_DERIVED_COLUMNS)]] + SQL_DERIVED_COLUMNS
+
+
+def sqlInsertStatement(size, table="recordings"):
+	columns = sqlRowColumns(size)
+	return "INSERT OR REPLACE INTO " + table + " (" + ", ".join(columns) + ") VALUES (" + sqlParameters(columns) + ")"
+
+
+def sqlPathRanges(dirs, exclude_dirs, column="path"):
+	# condition and parameters which select the paths below dirs, except below exclude_dirs
+	sql = "(" + " OR ".join(["(" + column + " > ? AND " + column + " < ?)"] * len(dirs)) + ")"
+	sql += "".join([" AND NOT (" + column + " > ? AND " + column + " < ?)"] * len(exclude_dirs))
+	return sql, tuple([bound for adir in dirs + exclude_dirs for bound in (adir + "/", adir + "0")])
+
+
+def sqlTagRows(rows):
+	# (tag, path) rows of the tags of the (path, tags) rows
+	return [(tag, path) for path, tags in rows for tag in set((tags or "").split())]
+
+
+def sqlFtsTable(table):
+	return table + "_fts"
+
+
+def sqlFtsTriggers(table):
+	# statements which create the triggers that keep the full-text index of table up to date
+	fts_table = sqlFtsTable(table)
+	columns = ", ".join(SQL_FTS_COLUMNS)
+	new_values = ", ".join(["new." + column for column in SQL_FTS_COLUMNS])
+	insert = "INSERT INTO " + fts_table + " (docid, " + columns + ") VALUES (new.rowid, " + new_values + ");"
+	delete = "DELETE FROM " + fts_table + " WHERE docid = old.rowid;"
+	return [
+		"CREATE TRIGGER " + table + "_fts_insert AFTER INSERT ON " + table + " BEGIN " + insert + " END",
+		"CREATE TRIGGER " + table + "_fts_delete AFTER DELETE ON " + table + " BEGIN " + delete + " END",
+		"CREATE TRIGGER " + table + "_fts_update AFTER UPDATE OF " + columns + " ON " + table + " BEGIN " + delete + " " + insert + " END",
+	]
+
+
+def sqlSearchWords(text):
+	# lower case words of text, without the characters which have a meaning in fts queries or LIKE patterns
+	if isinstance(text, bytes):
+		text = text.decode("utf-8", "ignore")
+	return [word.lower() for word in re.findall(r"\w+", text, re.UNICODE)]
+
+
+def sqlSearchRank(matchinfo):
+	# rank of a search result from its fts4 matchinfo "pcx": the number of phrases and columns, followed by
+	# the hits in the row, the hits in all rows and the number of rows with hits of each phrase in each column.
+	# Hits of phrases which are found in few rows and hits in names count most
+	values = struct.unpack("%dI" % (len(matchinfo) // 4), bytes(matchinfo))
+	phrases, columns = values[0], values[1]
+	rank = 0.0
+	for i in range(phrases * columns):
+		hits, _all_hits, rows = values[2 + 3 * i:5 + 3 * i]
+		if hits:
+			rank += SQL_FTS_WEIGHTS[i % columns] * hits / rows
+	return rank
 
 
 class FileCacheSQL():
 
-	def __init__(self, sql_db_name):
-		print("MVC-I: FileCacheSQL: __init__")
-		self.sql_conn = sqlite.connect(sql_db_name)
+	def __init__(self, sql_db_name, volatile=False, sort_articles=False):
+		# the database uses a write-ahead log, so that list queries on the read connection see the last commit
+		# and are not blocked by the write connection, e.g. while a load keeps its transaction open.
+		# a volatile database (e.g. on tmpfs) is written without syncs, its durable copy is written by sqlCheckpoint()
+		print("MVC-I: FileCacheSQL: __init__: sql_db_name: %s, volatile: %s" % (sql_db_name, volatile))
+		self.sql_db_name = sql_db_name
+		self.sql_conn = sqlite.connect(sql_db_name, cached_statements=SQL_CACHED_STATEMENTS)
+		self.sql_conn.execute("PRAGMA journal_mode = WAL")
+		self.sql_conn.execute("PRAGMA synchronous = " + ("OFF" if volatile else "NORMAL"))
+		# rows which are replaced by INSERT OR REPLACE are removed from the full-text index by the delete trigger
+		self.sql_conn.execute("PRAGMA recursive_triggers = ON")
+		self.sql_checkpoint_changes = self.sql_conn.total_changes
+		# the sort keys ignore leading articles
+		self.sql_sort_articles = sort_articles
+		# bulk loads are written to sql_load_table, changes of single rows to all sql_tables
+		self.sql_load_table = "recordings"
+		self.sql_tables = ["recordings"]
 		self.sqlCreateTable()
+		self.sql_read_conn = sqlite.connect(sql_db_name, cached_statements=SQL_CACHED_STATEMENTS)
+		self.sql_read_conn.text_factory = str
+		self.sql_read_conn.create_function("search_rank", 1, sqlSearchRank)
+		self.read_cursor = self.sql_read_conn.cursor()
 
 	def sqlCreateTable(self):
-		self.sql_conn.execute(
-			'''CREATE TABLE IF NOT EXISTS recordings (directory TEXT, filetype INTEGER, path TEXT, fileName TEXT, fileExt TEXT, name TEXT, event_start_time INTEGER, recording_start_time INTEGER, recording_stop_time INTEGER, length INTEGER,\
-			description TEXT, extended_description TEXT, service_reference TEXT, size INTEGER, cuts TEXT, tags TEXT)'''
-		)
+		# databases of older plugin versions are migrated in place, so that upgrades keep the cache
 		self.sql_conn.text_factory = str
 		self.cursor = self.sql_conn.cursor()
+		self.sql_aggregates_created = False
+		self.sql_populated_dirs_created = False
+		self.sql_conn.execute("CREATE TABLE IF NOT EXISTS schema_version (" + SQL_TABLE_SCHEMA_VERSION + ")")
+		version = self.sqlSelectSchemaVersion()
+		if version < SQL_SCHEMA_VERSION:
+			print("MVC-I: FileCacheSQL: sqlCreateTable: migrating schema version %s to %s" % (version, SQL_SCHEMA_VERSION))
+			self.__sqlMigrate(version)
+		# left over by a rebuild which was interrupted by a shutdown
+		self.sql_conn.execute("DROP TABLE IF EXISTS " + SQL_SHADOW_TABLE)
+		self.sql_conn.execute("DROP TABLE IF EXISTS " + sqlFtsTable(SQL_SHADOW_TABLE))
+		self.sql_conn.commit()
+		# without fts4 in the sqlite library, searches fall back to LIKE
+		self.sql_fts = self.__sqlTableExists(sqlFtsTable("recordings"))
 
-	def sqlClearTable(self):
-		self.cursor.execute("DELETE FROM recordings")
+	def sqlSelectSchemaVersion(self):
+		# 0 for new databases and databases of versions before schema versioning
+		self.cursor.execute("SELECT version FROM schema_version")
+		row = self.cursor.fetchone()
+		return row[0] if row else 0
+
+	def __sqlMigrate(self, version):
+		# the steps only rely on the tables found in the database, so that an interrupted migration
+		# is completed on the next start. A failing step raises, so that the version is only written
+		# after all steps have succeeded
+		if version < 1:
+			# recordings table with path as primary key and stat signature columns
+			if self.__sqlTableNeedsMigration():
+				self.__sqlMigrateTable()
+			else:
+				self.sql_conn.execute("CREATE TABLE IF NOT EXISTS recordings (" + SQL_TABLE_RECORDINGS + ")")
+			for sql in SQL_INDEXES_RECORDINGS:
+				self.sql_conn.execute(sql)
+		if version < 2:
+			# a new aggregates table has to be filled from the existing recordings by the owner of the cache
+			self.sql_aggregates_created = not self.__sqlTableExists("aggregates")
+			self.sql_conn.execute("CREATE TABLE IF NOT EXISTS aggregates (" + SQL_TABLE_AGGREGATES + ")")
+		if version < 3:
+			# a new populated_dirs table has to be filled for the existing recordings by the owner of the cache
+			self.sql_populated_dirs_created = not self.__sqlTableExists("populated_dirs")
+			self.sql_conn.execute("CREATE TABLE IF NOT EXISTS populated_dirs (" + SQL_TABLE_POPULATED_DIRS + ")")
+		if version < 4:
+			# progress column for the list rows
+			self.__sqlAddColumn("progress")
+		if version < 5:
+			# sort_key column and index for sorting by name in the database
+			self.__sqlAddColumn("sort_key")
+			for sql in SQL_INDEXES_RECORDINGS:
+				self.sql_conn.execute(sql)
+			self.__sqlUpdateDerived("recordings")
+		if version < 6:
+			# full-text index of names and descriptions for searches
+			if not self.__sqlTableExists(sqlFtsTable("recordings")):
+				self.__sqlCreateFts("recordings")
+		if version < 7:
+			# tags table for tag views
+			self.sql_conn.execute("CREATE TABLE IF NOT EXISTS tags (" + SQL_TABLE_TAGS + ")")
+			for sql in SQL_INDEXES_TAGS:
+				self.sql_conn.execute(sql)
+			for trigger in ["delete", "move"]:
+				self.sql_conn.execute("DROP TRIGGER IF EXISTS recordings_tags_" + trigger)
+			for sql in SQL_TRIGGERS_TAGS:
+				self.sql_conn.execute(sql)
+			self.__sqlRebuildTags()
+		if version < 8:
+			# indexes for the latest and unwatched views
+			for sql in SQL_INDEXES_RECORDINGS:
+				self.sql_conn.execute(sql)
+		if version < 9:
+			# parser cache, which replaces the pickle file of the previous version
+			self.sql_conn.execute("CREATE TABLE IF NOT EXISTS parser_cache (" + SQL_TABLE_PARSER_CACHE + ")")
+		self.sql_conn.execute("DELETE FROM schema_version")
+		self.sql_conn.execute("INSERT INTO schema_version (version) VALUES (?)", (SQL_SCHEMA_VERSION,))
 		self.sql_conn.commit()
 
-	def sqlSelect(self, where):
-		sql = "SELECT * FROM recordings WHERE " + where
-		#print("MVC: FileCacheSQL: sqlSelect: sql: %s" % sql)
-		self.cursor.execute(sql)
-		filelist = self.cursor.fetchall()
+	def __sqlTableExists(self, table):
+		self.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+		return len(self.cursor.fetchall()) > 0
+
+	def __sqlCreateFts(self, table):
+		# no commit: part of the transaction of the caller
+		# create the full-text index of table with its triggers and index the rows of table,
+		# returns False if the sqlite library has no fts4
+		fts_table = sqlFtsTable(table)
+		columns = ", ".join(SQL_FTS_COLUMNS)
+		for tokenizer in SQL_FTS_TOKENIZERS:
+			try:
+				self.cursor.execute("CREATE VIRTUAL TABLE " + fts_table + " USING fts4(" + columns + ", tokenize=" + tokenizer + ")")
+				break
+			except sqlite.OperationalError as e:
+				print("MVC-I: FileCacheSQL: __sqlCreateFts: tokenizer: %s, exception: %s" % (tokenizer, e))
+		else:
+			return False
+		for sql in sqlFtsTriggers(table):
+			self.cursor.execute(sql)
+		self.cursor.execute("INSERT INTO " + fts_table + " (docid, " + columns + ") SELECT rowid, " + columns + " FROM " + table)
+		return True
+
+	def __sqlGetColumns(self):
+		self.cursor.execute("PRAGMA table_info(recordings)")
+		return self.cursor.fetchall()
+
+	def __sqlAddColumn(self, column):
+		if column not in [name for _cid, name, _type, _notnull, _default, _pk in self.__sqlGetColumns()]:
+			self.sql_conn.execute("ALTER TABLE recordings ADD COLUMN " + column + " " + dict(SQL_COLUMNS_RECORDINGS)[column])
+
+	def __sqlTableNeedsMigration(self):
+		# databases created by older versions have no primary key on path or lack columns
+		columns = self.__sqlGetColumns()
+		if columns:
+			names = [name for _cid, name, _type, _notnull, _default, _pk in columns]
+			for _cid, name, _type, _notnull, _default, pk in columns:
+				if name == "path" and not pk:
+					return True
+			return names != [name for name, _sql_type in SQL_COLUMNS_RECORDINGS]
+		return False
+
+	def __sqlMigrateTable(self):
+		print("MVC-I: FileCacheSQL: __sqlMigrateTable: migrating recordings table...")
+		old_columns = [name for _cid, name, _type, _notnull, _default, _pk in self.__sqlGetColumns()]
+		columns = ", ".join([name for name, _sql_type in SQL_COLUMNS_RECORDINGS if name in old_columns])
+		# run the migration in an explicit transaction, so that it is all-or-nothing
+		self.sql_conn.isolation_level = None
+		try:
+			self.cursor.execute("BEGIN")
+			self.cursor.execute("ALTER TABLE recordings RENAME TO recordings_old")
+			self.cursor.execute("CREATE TABLE recordings (" + SQL_TABLE_RECORDINGS + ")")
+			# duplicate paths in the old table collapse to a single row
+			self.cursor.execute("INSERT OR REPLACE INTO recordings (" + columns + ") SELECT " + columns + " FROM recordings_old")
+			self.cursor.execute("DROP TABLE recordings_old")
+			self.cursor.execute("COMMIT")
+		except Exception as e:
+			print("MVC-E: FileCacheSQL: __sqlMigrateTable: exception: %s" % e)
+			self.cursor.execute("ROLLBACK")
+			self.sql_conn.isolation_level = ""
+			# the schema version must not be written for the old table
+			raise
+		self.sql_conn.isolation_level = ""
+
+	def sqlRow(self, filedata):
+		# filedata tuples may be followed by the stat signature columns, the derived columns are appended
+		return tuple(filedata) + (sqlProgress(filedata[SQL_IDX_CUTS], filedata[SQL_IDX_LENGTH]), getSortKey(filedata[SQL_IDX_NAME], self.sql_sort_articles))
+
+	def __sqlUpdateDerived(self, table, paths=None):
+		# no commit: part of the transaction of the caller
+		# compute the derived columns of the rows of paths, or of all rows
+		if paths is None:
+			self.cursor.execute("SELECT path, cuts, length, name FROM " + table)
+		else:
+			self.cursor.execute("SELECT path, cuts, length, name FROM " + table + " WHERE path IN (" + sqlParameters(paths) + ")", tuple(paths))
+		rows = [(sqlProgress(cuts, length), getSortKey(name, self.sql_sort_articles), path) for path, cuts, length, name in self.cursor.fetchall()]
+		self.cursor.executemany("UPDATE " + table + " SET progress = ?, sort_key = ? WHERE path = ?", rows)
+
+	def sqlUpdateSortKeys(self, sort_articles):
+		# recompute the sort keys of all rows, e.g. after the articles setting changed
+		self.sql_sort_articles = sort_articles
+		for table in self.sql_tables:
+			self.__sqlUpdateDerived(table)
 		self.sql_conn.commit()
-		return filelist
 
-	def sqlDelete(self, where):
-		sql = "DELETE FROM recordings WHERE " + where
-		#print("MVC: FileCacheSQL: sqlDelete: sql: %s" % sql)
-		self.cursor.execute(sql)
+	def __sqlInsertTags(self, table, rows):
+		# no commit: part of the transaction of the caller
+		# add the tags of the (path, tags) rows, the tags table only follows the recordings table
+		if table == "recordings":
+			self.cursor.executemany("INSERT OR IGNORE INTO tags VALUES (?, ?)", sqlTagRows(rows))
+
+	def __sqlRebuildTags(self):
+		# no commit: part of the transaction of the caller
+		self.cursor.execute("DELETE FROM tags")
+		self.cursor.execute("SELECT path, tags FROM recordings WHERE tags != ''")
+		self.__sqlInsertTags("recordings", self.cursor.fetchall())
+
+	def sqlBeginShadowTable(self):
+		# readers keep using the recordings table while a rebuild is loaded into the empty shadow table
+		self.sql_conn.execute("DROP TABLE IF EXISTS " + SQL_SHADOW_TABLE)
+		self.sql_conn.execute("DROP TABLE IF EXISTS " + sqlFtsTable(SQL_SHADOW_TABLE))
+		self.sql_conn.execute("CREATE TABLE " + SQL_SHADOW_TABLE + " (" + SQL_TABLE_RECORDINGS + ")")
+		if self.sql_fts:
+			self.__sqlCreateFts(SQL_SHADOW_TABLE)
+		self.sql_load_table = SQL_SHADOW_TABLE
+		self.sql_tables = ["recordings", SQL_SHADOW_TABLE]
+
+	def sqlSwapShadowTable(self, filetype):
+		# replace the recordings table with the shadow table and rebuild indexes and aggregates
+		# in an explicit transaction, so that readers see either the old or the new table
+		self.sql_conn.commit()
+		self.sql_conn.isolation_level = None
+		try:
+			self.cursor.execute("BEGIN")
+			self.cursor.execute("DROP TABLE recordings")
+			if self.sql_fts:
+				# the rowids of the shadow table survive the rename, and with them the docids of its full-text index
+				for trigger in ["insert", "delete", "update"]:
+					self.cursor.execute("DROP TRIGGER " + SQL_SHADOW_TABLE + "_fts_" + trigger)
+				self.cursor.execute("DROP TABLE " + sqlFtsTable("recordings"))
+				self.cursor.execute("ALTER TABLE " + sqlFtsTable(SQL_SHADOW_TABLE) + " RENAME TO " + sqlFtsTable("recordings"))
+			self.cursor.execute("ALTER TABLE " + SQL_SHADOW_TABLE + " RENAME TO recordings")
+			if self.sql_fts:
+				for sql in sqlFtsTriggers("recordings"):
+					self.cursor.execute(sql)
+			for sql in SQL_TRIGGERS_TAGS:
+				self.cursor.execute(sql)
+			self.__sqlRebuildTags()
+			for sql in SQL_INDEXES_RECORDINGS:
+				self.cursor.execute(sql)
+			self.sqlRebuildAggregates(filetype)
+			self.cursor.execute("COMMIT")
+		except Exception as e:
+			print("MVC-E: FileCacheSQL: sqlSwapShadowTable: exception: %s" % e)
+			self.cursor.execute("ROLLBACK")
+			self.sqlDropShadowTable()
+		self.sql_conn.isolation_level = ""
+		self.sql_load_table = "recordings"
+		self.sql_tables = ["recordings"]
+
+	def sqlCopyToShadowTable(self, paths, trees):
+		# no commit: part of the transaction of the caller
+		# replace the shadow table rows of paths and trees (dirs with everything below them) with those of the recordings table,
+		# e.g. the rows which were changed while the shadow table was loaded
+		conditions = [("path = ?", (path,)) for path in paths]
+		conditions += [("path = ? OR (path > ? AND path < ?)", (tree, tree + "/", tree + "0")) for tree in trees]
+		for condition, params in conditions:
+			self.cursor.execute("DELETE FROM " + SQL_SHADOW_TABLE + " WHERE " + condition, params)
+			self.cursor.execute("INSERT OR REPLACE INTO " + SQL_SHADOW_TABLE + " (" + SQL_COLUMNS + ") SELECT " + SQL_COLUMNS + " FROM recordings WHERE " + condition, params)
+
+	def sqlDropShadowTable(self):
+		self.sql_conn.rollback()
+		self.sql_conn.execute("DROP TABLE IF EXISTS " + SQL_SHADOW_TABLE)
+		self.sql_conn.execute("DROP TABLE IF EXISTS " + sqlFtsTable(SQL_SHADOW_TABLE))
+		self.sql_conn.commit()
+		self.sql_load_table = "recordings"
+		self.sql_tables = ["recordings"]
+
+	def sqlClearTable(self, commit=True):
+		self.cursor.execute("DELETE FROM recordings")
+		self.cursor.execute("DELETE FROM aggregates")
+		self.cursor.execute("DELETE FROM populated_dirs")
+		if commit:
+			self.sql_conn.commit()
+
+	def sqlSelectFile(self, path, columns=SQL_FILEDATA):
+		self.cursor.execute("SELECT " + columns + " FROM recordings WHERE path = ?", (path,))
+		return self.cursor.fetchone()
+
+	def sqlExists(self, path):
+		self.cursor.execute("SELECT 1 FROM recordings WHERE path = ? LIMIT 1", (path,))
+		return self.cursor.fetchone() is not None
+
+	def __sqlCursor(self, read):
+		# read: committed content only, for list queries which are not part of a change
+		return self.read_cursor if read else self.cursor
+
+	def sqlSelectFileList(self, dirs, filetype, read=False, columns=SQL_FILEDATA):
+		# all rows of filetype in dirs
+		sql = "SELECT " + columns + " FROM recordings WHERE directory IN (" + sqlParameters(dirs) + ") AND filetype = ?"
+		cursor = self.__sqlCursor(read)
+		cursor.execute(sql, tuple(dirs) + (filetype,))
+		return cursor.fetchall()
+
+	def sqlSelectDirList(self, dirs, filetype, exclude_names, read=False, columns=SQL_FILEDATA):
+		# all rows with a filetype above filetype in dirs, except the rows of exclude_names
+		sql = "SELECT " + columns + " FROM recordings WHERE directory IN (" + sqlParameters(dirs) + ") AND filetype > ? AND fileName NOT IN (" + sqlParameters(exclude_names) + ")"
+		cursor = self.__sqlCursor(read)
+		cursor.execute(sql, tuple(dirs) + (filetype,) + tuple(exclude_names))
+		return cursor.fetchall()
+
+	def sqlSelectSortedList(self, dirs, filetype, exclude_names, with_dirs, dirs_first, sort_mode):
+		# key rows of filetype in dirs, with_dirs also of the rows with a filetype above filetype, except the rows of exclude_names,
+		# sorted by sort_mode. With dirs_first, the dirs are sorted by name ahead of the files,
+		# so that the files of a single dir in alpha sort order are read along the sort_key index
+		dirlist = []
+		sql = "SELECT " + SQL_KEYDATA + " FROM recordings WHERE directory IN (" + sqlParameters(dirs) + ") AND "
+		sql_dirs = "filetype > ? AND fileName NOT IN (" + sqlParameters(exclude_names) + ")"
+		params = tuple(dirs) + (filetype,)
+		params_dirs = (filetype,) + tuple(exclude_names)
+		if with_dirs and dirs_first:
+			self.read_cursor.execute(sql + sql_dirs + " ORDER BY sort_key", tuple(dirs) + params_dirs)
+			dirlist = self.read_cursor.fetchall()
+		if with_dirs and not dirs_first:
+			self.read_cursor.execute(sql + "(filetype = ? OR (" + sql_dirs + ")) ORDER BY " + SQL_SORT_ORDERS[sort_mode], params + params_dirs)
+		else:
+			self.read_cursor.execute(sql + "filetype = ? ORDER BY " + SQL_SORT_ORDERS[sort_mode], params)
+		return dirlist + self.read_cursor.fetchall()
+
+	def sqlSelectListRows(self, paths):
+		# list rows of paths, in no particular order
+		self.read_cursor.execute("SELECT " + SQL_LISTDATA + " FROM recordings WHERE path IN (" + sqlParameters(paths) + ")", tuple(paths))
+		return self.read_cursor.fetchall()
+
+	def sqlSelectSearchList(self, text, dirs, exclude_dirs, filetype, limit):
+		# key rows of filetype below dirs, except below exclude_dirs, whose name or descriptions contain words
+		# starting with all words of text, best matches first
+		words = sqlSearchWords(text)
+		if not words:
+			return []
+		sql_dirs, params_dirs = sqlPathRanges(dirs, exclude_dirs)
+		columns = ", ".join(["recordings." + column for column in SQL_KEYDATA.split(", ")])
+		if self.sql_fts:
+			fts_table = sqlFtsTable("recordings")
+			sql = "SELECT " + columns + " FROM " + fts_table + " JOIN recordings ON recordings.rowid = " + fts_table + ".docid"
+			sql += " WHERE " + fts_table + " MATCH ? AND filetype = ? AND " + sql_dirs
+			sql += " ORDER BY search_rank(matchinfo(" + fts_table + ", 'pcx')) DESC, event_start_time DESC LIMIT ?"
+			query = u" ".join([word + u"*" if len(word) >= SQL_FTS_PREFIX_MIN else word for word in words])
+			params = (query, filetype) + params_dirs + (limit,)
+		else:
+			sql_like = " OR ".join([column + " LIKE ?" for column in SQL_FTS_COLUMNS])
+			sql = "SELECT " + columns + " FROM recordings WHERE filetype = ? AND " + sql_dirs
+			sql += "".join([" AND (" + sql_like + ")"] * len(words)) + " ORDER BY event_start_time DESC LIMIT ?"
+			params = (filetype,) + params_dirs + tuple([u"%" + word + u"%" for word in words for _column in SQL_FTS_COLUMNS]) + (limit,)
+		self.read_cursor.execute(sql, params)
+		return self.read_cursor.fetchall()
+
+	def sqlSelectTagList(self, tag, dirs, exclude_dirs, filetype, sort_mode):
+		# key rows of filetype with tag below dirs, except below exclude_dirs, sorted by sort_mode
+		sql_dirs, params_dirs = sqlPathRanges(dirs, exclude_dirs, "recordings.path")
+		columns = ", ".join(["recordings." + column for column in SQL_KEYDATA.split(", ")])
+		sql = "SELECT " + columns + " FROM tags JOIN recordings ON recordings.path = tags.path"
+		sql += " WHERE tag = ? AND filetype = ? AND " + sql_dirs + " ORDER BY " + SQL_SORT_ORDERS[sort_mode]
+		self.read_cursor.execute(sql, (tag, filetype) + params_dirs)
+		return self.read_cursor.fetchall()
+
+	def sqlSelectLatestList(self, dirs, exclude_dirs, filetype, sort_mode, limit):
+		# key rows of the limit newest rows of filetype below dirs, except below exclude_dirs, sorted by sort_mode
+		sql_dirs, params_dirs = sqlPathRanges(dirs, exclude_dirs)
+		sql = "SELECT " + SQL_KEYDATA + " FROM (SELECT " + SQL_KEYDATA + ", event_start_time, sort_key FROM recordings"
+		sql += " WHERE filetype = ? AND " + sql_dirs + " ORDER BY event_start_time DESC LIMIT ?) ORDER BY " + SQL_SORT_ORDERS[sort_mode]
+		self.read_cursor.execute(sql, (filetype,) + params_dirs + (limit,))
+		return self.read_cursor.fetchall()
+
+	def sqlSelectUnwatchedList(self, dirs, exclude_dirs, filetype, sort_mode, max_progress):
+		# key rows of filetype below dirs, except below exclude_dirs, with a progress below max_progress, sorted by sort_mode
+		sql_dirs, params_dirs = sqlPathRanges(dirs, exclude_dirs)
+		sql = "SELECT " + SQL_KEYDATA + " FROM recordings WHERE filetype = ? AND progress < ? AND " + sql_dirs + " ORDER BY " + SQL_SORT_ORDERS[sort_mode]
+		self.read_cursor.execute(sql, (filetype, max_progress) + params_dirs)
+		return self.read_cursor.fetchall()
+
+	def sqlSelectTags(self, dirs, exclude_dirs):
+		# (tag, count) of the tags of the rows below dirs, except below exclude_dirs.
+		# Only files have tags, so that the tags table is not joined with the recordings table
+		sql_dirs, params_dirs = sqlPathRanges(dirs, exclude_dirs)
+		self.read_cursor.execute("SELECT tag, COUNT(*) FROM tags WHERE " + sql_dirs + " GROUP BY tag ORDER BY tag", params_dirs)
+		return self.read_cursor.fetchall()
+
+	def sqlSelectSignatures(self, dirs=None):
+		# returns (path, stat_mtime, stat_size, stat_inode) of all rows, or of all rows below dirs
+		if dirs is None:
+			self.cursor.execute("SELECT path, stat_mtime, stat_size, stat_inode FROM recordings")
+			return self.cursor.fetchall()
+		signatures = []
+		for adir in dirs:
+			# all paths starting with adir + "/" sort between adir + "/" and adir + "0"
+			self.cursor.execute("SELECT path, stat_mtime, stat_size, stat_inode FROM recordings WHERE path > ? AND path < ?", (adir + "/", adir + "0"))
+			signatures += self.cursor.fetchall()
+		return signatures
+
+	def sqlSelectSignature(self, path):
+		self.cursor.execute("SELECT stat_mtime, stat_size, stat_inode FROM recordings WHERE path = ?", (path,))
+		return self.cursor.fetchone()
+
+	def sqlUpdateSignatures(self, signatures):
+		# no commit: part of the transaction of the caller
+		# signatures is a list of (path, (stat_mtime, stat_size, stat_inode))
+		for table in self.sql_tables:
+			self.cursor.executemany(
+				"UPDATE " + table + " SET stat_mtime = ?, stat_size = ?, stat_inode = ? WHERE path = ?",
+				[signature + (path,) for path, signature in signatures]
+			)
+
+	def sqlDeleteFile(self, path):
+		for table in self.sql_tables:
+			self.cursor.execute("DELETE FROM " + table + " WHERE path = ?", (path,))
+		self.sql_conn.commit()
+
+	def sqlDeleteDirFiles(self, directory):
+		# no commit: part of the transaction of the caller
+		# delete the files and subdirs directly in directory
+		for table in self.sql_tables:
+			self.cursor.execute("DELETE FROM " + table + " WHERE directory = ?", (directory,))
+
+	def sqlDeleteTree(self, path):
+		# no commit: part of the transaction of the caller
+		# delete path and everything below it, including its aggregates
+		for table in self.sql_tables:
+			self.cursor.execute("DELETE FROM " + table + " WHERE path = ? OR (path > ? AND path < ?)", (path, path + "/", path + "0"))
+		self.cursor.execute("DELETE FROM aggregates WHERE directory = ? OR (directory > ? AND directory < ?)", (path, path + "/", path + "0"))
+
+	def sqlMoveTree(self, path, dest_path, copy):
+		# no commit: part of the transaction of the caller
+		# move (copy: duplicate) the rows of path and everything below it to dest_path, together with their aggregates and
+		# populated dirs. The paths below path are selected by range instead of LIKE, as % and _ may be part of file names.
+		# They are rewritten in python, as substr() counts characters while len() of a py2 str counts bytes.
+		def rewrite(apath):
+			if apath == path or apath.startswith(path + "/"):
+				return dest_path + apath[len(path):]
+			# directory of the row of path itself
+			return os.path.dirname(dest_path)
+
+		for table in self.sql_tables:
+			if copy:
+				self.cursor.execute("SELECT " + SQL_COLUMNS + " FROM " + table + " WHERE path = ? OR (path > ? AND path < ?)", (path, path + "/", path + "0"))
+				rows = [(rewrite(row[0]), row[1], rewrite(row[2])) + tuple(row[3:]) for row in self.cursor.fetchall()]
+				if rows:
+					self.cursor.executemany(sqlInsertStatement(len(rows[0]), table), rows)
+					self.__sqlInsertTags(table, [(row[SQL_IDX_PATH], row[SQL_IDX_TAGS]) for row in rows])
+			else:
+				self.cursor.execute("SELECT path, directory FROM " + table + " WHERE path = ? OR (path > ? AND path < ?)", (path, path + "/", path + "0"))
+				rows = [(rewrite(apath), rewrite(directory), apath) for apath, directory in self.cursor.fetchall()]
+				self.cursor.executemany("UPDATE " + table + " SET path = ?, directory = ? WHERE path = ?", rows)
+		for table in ["aggregates", "populated_dirs"]:
+			self.cursor.execute("SELECT * FROM " + table + " WHERE directory = ? OR (directory > ? AND directory < ?)", (path, path + "/", path + "0"))
+			rows = [(rewrite(row[0]),) + tuple(row[1:]) for row in self.cursor.fetchall()]
+			if not copy:
+				self.cursor.execute("DELETE FROM " + table + " WHERE directory = ? OR (directory > ? AND directory < ?)", (path, path + "/", path + "0"))
+			if rows:
+				self.cursor.executemany("INSERT OR REPLACE INTO " + table + " VALUES (" + sqlParameters(rows[0]) + ")", rows)
+
+	def sqlDeleteList(self, paths):
+		# no commit: part of the bulk load transaction of the caller
+		self.cursor.executemany("DELETE FROM " + self.sql_load_table + " WHERE path = ?", [(path,) for path in paths])
+
+	def sqlUpsert(self, filedata):
+		# update the row of path in place, or insert it if it does not exist yet
+		row = self.sqlRow(filedata)
+		columns = sqlRowColumns(len(row))
+		for table in self.sql_tables:
+			sql = "UPDATE " + table + " SET " + ", ".join([column + " = ?" for column in columns]) + " WHERE path = ?"
+			self.cursor.execute(sql, row + (row[columns.index("path")],))
+			if not self.cursor.rowcount:
+				self.cursor.execute(sqlInsertStatement(len(row), table), row)
+			elif table == "recordings":
+				self.cursor.execute("DELETE FROM tags WHERE path = ?", (row[columns.index("path")],))
+			self.__sqlInsertTags(table, [(row[columns.index("path")], row[columns.index("tags")])])
 		self.sql_conn.commit()
 
-	def sqlInsert(self, filedata):
-		self.cursor.execute("INSERT INTO recordings VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", filedata)
+	def sqlCheckUpdateColumns(self, values):
+		for column in values:
+			if column not in SQL_UPDATE_COLUMNS:
+				print("MVC-E: FileCacheSQL: sqlCheckUpdateColumns: invalid column: %s" % column)
+				return False
+		return True
+
+	def sqlUpdate(self, paths, values, commit=True):
+		# set the columns in values (column name: value) of all rows of paths with a single statement
+		if paths and values and self.sqlCheckUpdateColumns(values):
+			columns = list(values.keys())
+			for table in self.sql_tables:
+				sql = "UPDATE " + table + " SET " + ", ".join([column + " = ?" for column in columns]) + " WHERE path IN (" + sqlParameters(paths) + ")"
+				self.cursor.execute(sql, tuple([values[column] for column in columns]) + tuple(paths))
+				if "cuts" in values or "length" in values or "name" in values:
+					self.__sqlUpdateDerived(table, paths)
+				if "tags" in values and table == "recordings":
+					self.cursor.executemany("DELETE FROM tags WHERE path = ?", [(path,) for path in paths])
+					self.__sqlInsertTags(table, [(path, values["tags"]) for path in paths])
+			if commit:
+				self.sql_conn.commit()
+
+	def sqlInsertList(self, filelist):
+		# no commit: bulk inserts are part of the transaction of the caller
+		if filelist:
+			rows = [self.sqlRow(filedata) for filedata in filelist]
+			self.cursor.executemany(sqlInsertStatement(len(rows[0]), self.sql_load_table), rows)
+			self.__sqlInsertTags(self.sql_load_table, [(row[SQL_IDX_PATH], row[SQL_IDX_TAGS]) for row in rows])
+
+	def sqlSelectSubDirs(self, dirs, filetype):
+		# returns the paths of all cached dirs (rows of filetype) below dirs
+		subdirs = []
+		for adir in dirs:
+			self.cursor.execute("SELECT path FROM recordings WHERE filetype = ? AND path > ? AND path < ?", (filetype, adir + "/", adir + "0"))
+			subdirs += [path for (path,) in self.cursor.fetchall() if os.path.basename(path) != ".."]
+		return subdirs
+
+	def sqlSelectPopulatedDirs(self):
+		self.cursor.execute("SELECT directory FROM populated_dirs")
+		return [directory for (directory,) in self.cursor.fetchall()]
+
+	def sqlInsertPopulatedDirs(self, dirs):
+		# no commit: part of the transaction of the caller
+		self.cursor.executemany("INSERT OR IGNORE INTO populated_dirs VALUES (?)", [(directory,) for directory in dirs])
+
+	def sqlClearPopulatedDirs(self):
+		# no commit: part of the transaction of the caller
+		self.cursor.execute("DELETE FROM populated_dirs")
+
+	def sqlDeletePopulatedTree(self, path):
+		# no commit: part of the transaction of the caller
+		self.cursor.execute("DELETE FROM populated_dirs WHERE directory = ? OR (directory > ? AND directory < ?)", (path, path + "/", path + "0"))
+
+	def sqlSelectAggregate(self, directory, read=False):
+		cursor = self.__sqlCursor(read)
+		cursor.execute("SELECT count, size FROM aggregates WHERE directory = ?", (directory,))
+		# fetchall completes the statement, so that the read connection does not keep its snapshot
+		aggregate = cursor.fetchall()
+		return aggregate[0] if aggregate else (0, 0)
+
+	def sqlUpdateAggregates(self, directory, count, size):
+		# no commit: part of the transaction of the caller
+		# add count and size to directory and all of its parent directories
+		while directory and directory != os.path.dirname(directory):
+			self.cursor.execute("INSERT OR IGNORE INTO aggregates VALUES (?, 0, 0)", (directory,))
+			self.cursor.execute("UPDATE aggregates SET count = count + ?, size = size + ? WHERE directory = ?", (count, size, directory))
+			directory = os.path.dirname(directory)
+
+	def sqlSelectDirAggregates(self, paths, filetype):
+		# returns (directory, count, size) of the rows of filetype among paths, grouped by their directory
+		aggregates = {}
+		for i in range(0, len(paths), SQL_MAX_PATH_PARAMETERS):
+			chunk = tuple(paths[i:i + SQL_MAX_PATH_PARAMETERS])
+			self.cursor.execute(
+				"SELECT directory, COUNT(*), SUM(size) FROM recordings WHERE filetype = ? AND path IN (" + sqlParameters(chunk) + ") GROUP BY directory",
+				(filetype,) + chunk
+			)
+			for directory, count, size in self.cursor.fetchall():
+				dir_count, dir_size = aggregates.get(directory, (0, 0))
+				aggregates[directory] = (dir_count + count, dir_size + size)
+		return [(directory, count, size) for directory, (count, size) in aggregates.items()]
+
+	def sqlRebuildAggregates(self, filetype):
+		# no commit: part of the transaction of the caller
+		# recompute the aggregates of all rows of filetype, e.g. after a bulk load
+		aggregates = {}
+		self.cursor.execute("SELECT directory, COUNT(*), SUM(size) FROM recordings WHERE filetype = ? GROUP BY directory", (filetype,))
+		for directory, count, size in self.cursor.fetchall():
+			while directory and directory != os.path.dirname(directory):
+				dir_count, dir_size = aggregates.get(directory, (0, 0))
+				aggregates[directory] = (dir_count + count, dir_size + size)
+				directory = os.path.dirname(directory)
+		self.cursor.execute("DELETE FROM aggregates")
+		self.cursor.executemany("INSERT INTO aggregates VALUES (?, ?, ?)", [(directory, count, size) for directory, (count, size) in aggregates.items()])
+
+	def sqlUpsertParserCache(self, rows):
+		# no commit: part of the transaction of the caller
+		# rows are (path, signature, meta, eit) with pickled values
+		self.cursor.executemany("INSERT OR REPLACE INTO parser_cache VALUES (?, ?, ?, ?)", [(path, sqlite.Binary(signature), sqlite.Binary(meta), sqlite.Binary(eit)) for path, signature, meta, eit in rows])
+
+	def sqlPruneParserCache(self, paths):
+		# no commit: part of the transaction of the caller
+		# delete the entries of all paths which are not in paths
+		self.cursor.execute("SELECT path FROM parser_cache")
+		self.cursor.executemany("DELETE FROM parser_cache WHERE path = ?", [(path,) for (path,) in self.cursor.fetchall() if path not in paths])
+
+	def sqlCommit(self):
 		self.sql_conn.commit()
 
+	def sqlRollback(self):
+		self.sql_conn.rollback()
+
+	def sqlCheckpoint(self, path):
+		# copies the committed database content to path, if it changed since the last checkpoint.
+		# must not be called while a transaction with uncommitted changes is kept open
+		if self.sql_conn.total_changes == self.sql_checkpoint_changes and os.path.exists(path):
+			return True
+		try:
+			self.cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+			busy = self.cursor.fetchone()[0]
+		except Exception as e:
+			print("MVC-E: FileCacheSQL: sqlCheckpoint: exception: %s" % e)
+			busy = True
+		if busy:
+			print("MVC-I: FileCacheSQL: sqlCheckpoint: database is busy")
+			return False
+		# a file which is replaced by rename is always complete
+		try:
+			shutil.copyfile(self.sql_db_name, path + ".tmp")
+			# a write-ahead log left over from a session without ram database would be applied to the new file
+			for wal_path in [path + "-wal", path + "-shm"]:
+				if os.path.exists(wal_path):
+					os.remove(wal_path)
+			os.rename(path + ".tmp", path)
+		except (IOError, OSError) as e:
+			print("MVC-E: FileCacheSQL: sqlCheckpoint: path: %s, exception: %s" % (path, e))
+			return False
+		self.sql_checkpoint_changes = self.sql_conn.total_changes
+		print("MVC-I: FileCacheSQL: sqlCheckpoint: path: %s" % path)
+		return True
+
 	def sqlClose(self):
+		self.sql_read_conn.close()
 		self.sql_conn.commit()
 		self.sql_conn.close()
@@ -0,0 +1,339 @@
+#!/usr/bin/python
+# coding=utf-8
+#
+# Copyright (C) 2018-2020 by dream-alpha
+#
+# In case of reuse of this source code please do not remove this copyright.
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	For more information on the GNU General Public License see:
+#	<http://www.gnu.org/licenses/>.
+
+
+
+import os
+import time
+import fcntl
+import struct
+import ctypes
+import ctypes.util
+from Components.config import config
+from enigma import eSocketNotifier
+from Bookmarks import getBookmarks
+from DelayTimer import DelayTimer
+from MountPoints import getFileSystemType
+from FileCache import FileCache, FILE_TYPE_DIR
+from FileUtils import scanDir
+from ServiceUtils import EXT_TS, EXT_VIDEO
+
+
+# inotify event masks, see <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+
+# struct inotify_event: wd, mask, cookie, len, followed by len bytes of name
+EVENT_HEADER = "iIII"
+EVENT_HEADER_SIZE = struct.calcsize(EVENT_HEADER)
+
+# file systems which do not report changes made by other hosts
+POLL_FSTYPES = ["nfs", "nfs4", "cifs", "smbfs", "smb3", "fuse.sshfs"]
+
+# files belonging to a recording
+SIDECAR_EXTS = [".cuts", ".meta", ".xmeta"]
+
+# wait until no more events arrive for this time (ms) before updating the cache
+DEBOUNCE_TIME = 2000
+
+
+instance = None
+
+
+class FileCacheWatcher():
+
+	def __init__(self):
+		print("MVC-I: FileCacheWatcher: __init__")
+		self.inotify_fd = -1
+		self.notifier = None
+		self.notifier_conn = None
+		self.watches = {}
+		self.poll_dirs = []
+		self.load_paths = set()
+		self.resync_dirs = set()
+		self.moved_from = {}
+		self.moves = []
+		self.dirs_moved_from = {}
+		self.dir_moves = []
+		self.load_dirs = []
+		self.last_event_time = 0
+		self.flush_scheduled = False
+		self.__initInotify()
+		visited = {}
+		for bookmark in getBookmarks():
+			if self.inotify_fd < 0 or getFileSystemType(bookmark) in POLL_FSTYPES or not self.__addWatches(bookmark, visited):
+				print("MVC-I: FileCacheWatcher: __init__: polling: %s" % bookmark)
+				self.poll_dirs.append(bookmark)
+		if self.poll_dirs:
+			DelayTimer(self.__getPollInterval(), self.__poll)
+
+	@staticmethod
+	def getInstance():
+		global instance
+		if instance is None:
+			instance = FileCacheWatcher()
+		return instance
+
+	### inotify functions
+
+	def __initInotify(self):
+		try:
+			self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+			fd = self.libc.inotify_init()
+			if fd < 0:
+				raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+			fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+			fcntl.fcntl(fd, fcntl.F_SETFD, fcntl.FD_CLOEXEC)
+			self.inotify_fd = fd
+			self.notifier = eSocketNotifier(fd, eSocketNotifier.Read)
+			self.notifier_conn = self.notifier.activated.connect(self.__readEvents)
+		except Exception as e:
+			print("MVC-E: FileCacheWatcher: __initInotify: inotify is not available: %s" % e)
+
+	def __addWatches(self, adir, visited=None):
+		# watch adir and all of its subdirs, symlinked dirs are watched with their real path, like they are cached.
+		# visited maps the (device, inode) of the dirs walked so far to their paths, so that symlink loops end
+		#print("MVC: FileCacheWatcher: __addWatches: adir: %s" % adir)
+		if visited is None:
+			visited = {}
+		try:
+			adir_stat = os.stat(adir)
+		except OSError as e:
+			print("MVC-E: FileCacheWatcher: __addWatches: adir: %s, exception: %s" % (adir, e))
+			return False
+		key = (adir_stat.st_dev, adir_stat.st_ino)
+		if key in visited:
+			return True
+		visited[key] = adir
+		wd = self.libc.inotify_add_watch(self.inotify_fd, adir, WATCH_MASK)
+		if wd < 0:
+			print("MVC-E: FileCacheWatcher: __addWatches: adir: %s, error: %s" % (adir, os.strerror(ctypes.get_errno())))
+			return False
+		if wd in self.watches:
+			# inotify returns the watch of a dir which is watched already, e.g. by a walk of another bookmark
+			return True
+		self.watches[wd] = adir
+		try:
+			_names, _files, dirs = scanDir(adir, [], config.plugins.moviecockpit.cache_follow_symlinks.value)
+		except OSError as e:
+			print("MVC-E: FileCacheWatcher: __addWatches: adir: %s, exception: %s" % (adir, e))
+			return True
+		for path in dirs:
+			self.__addWatches(path, visited)
+		return True
+
+	def __removeWatches(self, adir):
+		# the watches of a moved dir still report events with its old path
+		for wd, path in self.watches.items():
+			if path == adir or path.startswith(adir + "/"):
+				self.libc.inotify_rm_watch(self.inotify_fd, wd)
+				del self.watches[wd]
+
+	def __readEvents(self, _fd=None):
+		try:
+			data = os.read(self.inotify_fd, 65536)
+		except OSError:
+			return
+		offset = 0
+		while offset + EVENT_HEADER_SIZE <= len(data):
+			wd, mask, cookie, name_len = struct.unpack_from(EVENT_HEADER, data, offset)
+			offset += EVENT_HEADER_SIZE
+			name = data[offset:offset + name_len].split("\0", 1)[0]
+			offset += name_len
+			self.__handleEvent(wd, mask, cookie, name)
+		self.last_event_time = time.time()
+		if not self.flush_scheduled:
+			self.flush_scheduled = True
+			DelayTimer(DEBOUNCE_TIME, self.__flush)
+
+	def __handleEvent(self, wd, mask, cookie, name):
+		#print("MVC: FileCacheWatcher: __handleEvent: wd: %s, mask: %x, cookie: %s, name: %s" % (wd, mask, cookie, name))
+		if mask & IN_Q_OVERFLOW:
+			print("MVC-I: FileCacheWatcher: __handleEvent: event queue overflow, resyncing bookmarks")
+			self.resync_dirs.update(getBookmarks())
+			return
+		adir = self.watches.get(wd)
+		if adir is None:
+			return
+		if mask & IN_IGNORED:
+			# watched dir was deleted or unmounted
+			del self.watches[wd]
+			return
+		path = os.path.join(adir, name)
+		if mask & IN_ISDIR:
+			# dir moves are (src_path, dest_path), new dirs have no src_path and deleted dirs no dest_path
+			if mask & IN_MOVED_FROM:
+				self.__removeWatches(path)
+				self.dirs_moved_from[cookie] = path
+			elif mask & IN_MOVED_TO:
+				self.__addWatches(path)
+				self.dir_moves.append((self.dirs_moved_from.pop(cookie, None), path))
+			elif mask & IN_CREATE:
+				self.__addWatches(path)
+				self.dir_moves.append((None, path))
+			elif mask & IN_DELETE:
+				self.dir_moves.append((path, None))
+		elif mask & IN_MOVED_FROM:
+			self.moved_from[cookie] = path
+		elif mask & IN_MOVED_TO and cookie in self.moved_from:
+			self.moves.append((self.moved_from.pop(cookie), path))
+		elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE):
+			self.load_paths.add(path)
+
+	### cache update functions
+
+	def __flush(self):
+		# update the cache, when no more events arrived during DEBOUNCE_TIME and no cache reload is running
+		if time.time() - self.last_event_time < DEBOUNCE_TIME / 1000.0 or FileCache.getInstance().isDatabaseLoadRunning():
+			DelayTimer(DEBOUNCE_TIME, self.__flush)
+			return
+		self.flush_scheduled = False
+		# moved files and dirs without a matching IN_MOVED_TO left the watched trees
+		self.load_paths.update(self.moved_from.values())
+		self.moved_from = {}
+		self.dir_moves += [(src_path, None) for src_path in self.dirs_moved_from.values()]
+		self.dirs_moved_from = {}
+		# only the lists of dirs whose cached content changed are reloaded, resynced dirs when their load is done
+		reload_dirs = set()
+		new_dirs = []
+		for src_path, dest_path in self.dir_moves:
+			changed_dirs, load_dirs = self.__moveDir(src_path, dest_path)
+			reload_dirs.update(changed_dirs)
+			new_dirs += load_dirs
+		new_dirs = [adir for adir in self.__getTopDirs(new_dirs) if os.path.isdir(adir)]
+		if self.resync_dirs:
+			# the lost events of an event queue overflow are covered by a resync, which includes the new dirs
+			self.load_dirs = self.__getTopDirs(self.resync_dirs)
+			FileCache.getInstance().loadDatabase(self.load_dirs, resync=True, callback=self.__loadDone)
+		elif new_dirs:
+			self.load_dirs = new_dirs
+			FileCache.getInstance().loadDatabaseDirs(new_dirs, callback=self.__loadDone)
+		for src_path, dest_path in self.moves:
+			if self.__moveFile(src_path, dest_path):
+				reload_dirs.update([os.path.dirname(src_path), os.path.dirname(dest_path)])
+		for path in self.load_paths:
+			if self.__updateFile(path):
+				reload_dirs.add(os.path.dirname(path))
+		self.resync_dirs = set()
+		self.moves = []
+		self.dir_moves = []
+		self.load_paths = set()
+		self.__reloadLists(reload_dirs)
+
+	def __loadDone(self):
+		self.__reloadLists(self.load_dirs)
+
+	def __reloadLists(self, dirs):
+		from MovieSelection import MovieSelection
+		movie_selection = MovieSelection.getInstance()
+		if movie_selection and dirs:
+			movie_selection.reloadLists(dirs)
+
+	def __getTopDirs(self, dirs):
+		# drop the dirs which are resynced as part of another dir anyway
+		return [adir for adir in dirs if not [other for other in dirs if adir.startswith(other + "/")]]
+
+	def __getRecordingPaths(self, path):
+		# recording files which path belongs to
+		filename, ext = os.path.splitext(path)
+		if ext in EXT_VIDEO:
+			return [path]
+		if ext in SIDECAR_EXTS:
+			return [filename]
+		if ext == ".eit":
+			return [filename + ts_ext for ts_ext in EXT_TS]
+		return []
+
+	def __moveDir(self, src_path, dest_path):
+		# a cached dir which is moved to another dir keeps its cached rows,
+		# returns the dirs whose cached content changed and the dirs which have to be loaded
+		file_cache = FileCache.getInstance()
+		if dest_path and file_cache.exists(dest_path) and not (src_path and file_cache.exists(src_path)):
+			# the move or copy was already applied to the cache, e.g. by FileOps
+			return [], []
+		if src_path and dest_path and os.path.basename(src_path) == os.path.basename(dest_path) and file_cache.exists(src_path):
+			#print("MVC: FileCacheWatcher: __moveDir: %s > %s" % (src_path, dest_path))
+			file_cache.move(src_path, os.path.dirname(dest_path), FILE_TYPE_DIR)
+			return [os.path.dirname(src_path), os.path.dirname(dest_path)], []
+		changed_dirs = []
+		if src_path:
+			#print("MVC: FileCacheWatcher: __moveDir: delete: %s" % src_path)
+			if file_cache.exists(src_path):
+				changed_dirs.append(os.path.dirname(src_path))
+			file_cache.delete(src_path, FILE_TYPE_DIR)
+		if dest_path:
+			# the row of the new dir is added when its load begins
+			changed_dirs.append(os.path.dirname(dest_path))
+			return changed_dirs, [dest_path]
+		return changed_dirs, []
+
+	def __updateFile(self, path):
+		# returns True if the cached recordings of path changed
+		file_cache = FileCache.getInstance()
+		changed = False
+		for recording_path in self.__getRecordingPaths(path):
+			if os.path.isfile(recording_path):
+				if file_cache.hasFileChanged(recording_path):
+					#print("MVC: FileCacheWatcher: __updateFile: load: %s" % recording_path)
+					file_cache.loadDatabaseFile(recording_path)
+					changed = True
+			elif file_cache.exists(recording_path):
+				#print("MVC: FileCacheWatcher: __updateFile: delete: %s" % recording_path)
+				file_cache.delete(recording_path)
+				changed = True
+		return changed
+
+	def __moveFile(self, src_path, dest_path):
+		# a recording renamed to another dir keeps its cached data, anything else is updated like a new file.
+		# returns True if the cached row was moved
+		file_cache = FileCache.getInstance()
+		if file_cache.exists(dest_path) and not file_cache.exists(src_path):
+			# the move was already applied to the cache, e.g. by FileOps
+			return False
+		if os.path.basename(src_path) == os.path.basename(dest_path) and file_cache.exists(src_path) and not file_cache.exists(dest_path):
+			#print("MVC: FileCacheWatcher: __moveFile: %s > %s" % (src_path, dest_path))
+			file_cache.move(src_path, os.path.dirname(dest_path))
+			return True
+		self.load_paths.update([src_path, dest_path])
+		return False
+
+	### polling functions
+
+	def __getPollInterval(self):
+		return int(config.plugins.moviecockpit.cache_watch_poll_interval.value) * 60 * 1000
+
+	def __poll(self):
+		# file systems without inotify support are resynced periodically, based on the stat signatures of the files
+		DelayTimer(self.__getPollInterval(), self.__poll)
+		if not FileCache.getInstance().isDatabaseLoadRunning():
+			#print("MVC: FileCacheWatcher: __poll: %s" % self.poll_dirs)
+			FileCache.getInstance().loadDatabase(self.poll_dirs, resync=True, callback=self.__pollDone)
+
+	def __pollDone(self):
+		self.__reloadLists(self.poll_dirs)
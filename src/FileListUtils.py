@@ -21,7 +21,7 @@
 
 import os
 from Components.config import config
-from FileCache import FileCache, FILE_TYPE_DIR, FILE_IDX_TYPE, FILE_IDX_DIR, FILE_IDX_NAME, FILE_IDX_EVENT_START_TIME, FILE_IDX_PATH
+from FileCache import FileCache, LIST_IDX_DIR, LIST_IDX_NAME, LIST_IDX_PATH, SEARCH_DIR, TAG_DIR, VIEW_DIRS
 from Bookmarks import getBookmarks
 from ServiceUtils import getService
 from ConfigInit import sort_modes
@@ -30,7 +30,7 @@ from ConfigInit import sort_modes
 def getEntry4Path(filelist, path):
 	list_entry = None
 	for entry in filelist:
-		if entry and entry[FILE_IDX_PATH] == path:
+		if entry and entry[LIST_IDX_PATH] == path:
 			list_entry = entry
 			break
 	return list_entry
@@ -39,7 +39,7 @@ def getEntry4Path(filelist, path):
 def getIndex4Path(filelist, path):
 	index = -1
 	for i, entry in enumerate(filelist):
-		if entry and entry[FILE_IDX_PATH] == path:
+		if entry and entry[LIST_IDX_PATH] == path:
 			index = i
 			break
 	return index
@@ -48,8 +48,8 @@ def getIndex4Path(filelist, path):
 def getService4Path(filelist, path):
 	service = None
 	for entry in filelist:
-		if entry and entry[FILE_IDX_PATH] == path:
-			service = getService(path, entry[FILE_IDX_NAME])
+		if entry and entry[LIST_IDX_PATH] == path:
+			service = getService(path, entry[LIST_IDX_NAME])
 			break
 	return service
 
@@ -57,7 +57,7 @@ def getService4Path(filelist, path):
 def loadedDirs(filelist):
 	loaded_dirs = []
 	for afile in filelist:
-		adir = afile[FILE_IDX_DIR]
+		adir = afile[LIST_IDX_DIR]
 		if adir not in loaded_dirs:
 			loaded_dirs.append(adir)
 	return loaded_dirs
@@ -70,48 +70,48 @@ def createFileList(path):
 	return filelist
 
 
-def createDirList(path):
-	#print("MVC: FileListUtils: createDirList: path: %s" % path)
+def getSearchDir(text):
+	return SEARCH_DIR + text
+
+
+def isSearchDir(path):
+	return path is not None and path.startswith(SEARCH_DIR)
+
+
+def getTagDir(tag):
+	return TAG_DIR + tag
+
+
+def isTagDir(path):
+	return path is not None and path.startswith(TAG_DIR)
+
+
+def isViewDir(path):
+	# virtual dirs of views over all bookmarks
+	return path is not None and path.startswith(tuple(VIEW_DIRS))
+
+
+def createSortedList(path, sort_mode):
+	# key rows of the files and dirs in path, sorted by the database, or of the files of the view of path
+	#print("MVC: FileListUtils: createSortedList: path: %s, sort_mode: %s" % (path, sort_mode))
 	filelist = []
 	if path:
-		filelist = FileCache.getInstance().getDirList([path])
+		with_dirs = config.plugins.moviecockpit.directories_show.value
+		# dirs which are not sorted with the files are shown on top
+		dirs_first = not config.plugins.moviecockpit.directories_ontop.value
+		filelist = FileCache.getInstance().getSortedList([path], sort_modes[sort_mode][0], with_dirs, dirs_first)
 	return filelist
 
 
 def createCustomList(path):
 	#print("MVC: MovieSelection: createCustomList: path: %s" % path)
 	filelist = []
-	if path:
+	if path and not isViewDir(path):
 		if path not in getBookmarks():
-			filelist.append(FileCache.getInstance().getFile(os.path.join(path, "..")))
+			filelist.append(FileCache.getInstance().getListEntry(os.path.join(path, "..")))
 		else:  # path is a bookmark
 			if config.plugins.moviecockpit.trashcan_enable.value and config.plugins.moviecockpit.trashcan_show.value:
-				filelist.append(FileCache.getInstance().getFile(path + "/trashcan"))
+				filelist.append(FileCache.getInstance().getListEntry(path + "/trashcan"))
 	#print("MVC: MovieSelection: createCustomList: filelist: " + str(filelist))
 	return filelist
 
-
-def sortList(filelist, sort_mode):
-	filetype_list = [] if config.plugins.moviecockpit.directories_ontop.value else [FILE_TYPE_DIR]
-	# This will find all unsortable items
-	tmp_list = [i for i in filelist if i and i[FILE_IDX_TYPE] in filetype_list or i[FILE_IDX_NAME] == ".."]
-	# Extract list items to be sorted
-	filelist = [i for i in filelist if i and i[FILE_IDX_TYPE] not in filetype_list and i[FILE_IDX_NAME] != ".."]
-	# Always sort via extension and sorttitle
-	tmp_list.sort(key=lambda x: (x[FILE_IDX_TYPE], x[FILE_IDX_NAME].lower()))
-
-	mode, order = sort_modes[sort_mode][0]
-
-	if mode == "date":
-		if not order:
-			filelist.sort(key=lambda x: (x[FILE_IDX_EVENT_START_TIME], x[FILE_IDX_NAME].lower()), reverse=True)
-		else:
-			filelist.sort(key=lambda x: (x[FILE_IDX_EVENT_START_TIME], x[FILE_IDX_NAME].lower()))
-
-	elif mode == "alpha":
-		if not order:
-			filelist.sort(key=lambda x: (x[FILE_IDX_NAME].lower(), -x[FILE_IDX_EVENT_START_TIME]))
-		else:
-			filelist.sort(key=lambda x: (x[FILE_IDX_NAME].lower(), x[FILE_IDX_EVENT_START_TIME]), reverse=True)
-
-	return tmp_list + filelist
@@ -20,7 +20,19 @@
 
 
 import os
+import stat
 import shutil
+try:
+	from os import scandir
+except ImportError:
+	try:
+		from scandir import scandir
+	except ImportError:
+		scandir = None
+
+
+# extensions of the recording sidecar files, which are never dirs
+EXT_SIDECAR = [".eit", ".meta", ".xmeta", ".cuts", ".jpg", ".txt", ".ap", ".sc"]
 
 
 def readFile(path):
@@ -34,6 +46,66 @@ def readFile(path):
 		return ""
 
 
+def scanDir(adir, exts, follow_symlinks=True):
+	# reads adir in a single pass and returns (names, files, dirs):
+	# names is the set of all entry names, files are (path, stat) of the files with an extension in exts,
+	# dirs are the paths of the subdirs. Symlinks are resolved to their real paths, or skipped.
+	names = set()
+	files = []
+	dirs = []
+	if scandir:
+		# the dir entry types come with the dir read, so only the files in exts and symlinks are stat'ed
+		for entry in scandir(adir):
+			names.add(entry.name)
+			if entry.is_symlink():
+				if not follow_symlinks:
+					continue
+				path = os.path.realpath(entry.path)
+				try:
+					path_stat = os.stat(path)
+				except OSError:
+					continue
+			elif entry.is_dir():
+				dirs.append(entry.path)
+				continue
+			elif os.path.splitext(entry.name)[1] in exts:
+				path = entry.path
+				path_stat = entry.stat()
+			else:
+				continue
+			if stat.S_ISDIR(path_stat.st_mode):
+				dirs.append(path)
+			elif stat.S_ISREG(path_stat.st_mode) and os.path.splitext(path)[1] in exts:
+				files.append((path, path_stat))
+	else:
+		for name in os.listdir(adir):
+			names.add(name)
+			if os.path.splitext(name)[1] in EXT_SIDECAR:
+				continue
+			path = os.path.join(adir, name)
+			try:
+				path_stat = os.lstat(path)
+				if stat.S_ISLNK(path_stat.st_mode):
+					if not follow_symlinks:
+						continue
+					path = os.path.realpath(path)
+					path_stat = os.stat(path)
+			except OSError:
+				continue
+			if stat.S_ISDIR(path_stat.st_mode):
+				dirs.append(path)
+			elif stat.S_ISREG(path_stat.st_mode) and os.path.splitext(path)[1] in exts:
+				files.append((path, path_stat))
+	return names, files, dirs
+
+
+def fileExists(path, dir_names=None):
+	# dir_names is the set of entry names of the dir of path, as returned by scanDir
+	if dir_names is not None:
+		return os.path.basename(path) in dir_names
+	return os.path.exists(path)
+
+
 def writeFile(path, data):
 	try:
 		f = open(path, "w")
@@ -72,3 +72,20 @@ def getMountPoint(path):
 			mountpoint = __mountpoint
 			break
 	return mountpoint
+
+
+def getFileSystemType(path):
+	# file system type of the mount (from /proc/mounts) containing path
+	path = os.path.realpath(path)
+	fstype = ""
+	mountpoint_len = -1
+	lines = readFile("/proc/mounts").splitlines()
+	for line in lines:
+		words = line.split(" ")
+		if len(words) >= 3:
+			mountpoint = words[1].replace("\\040", " ")
+			if (path == mountpoint or path.startswith(mountpoint.rstrip("/") + "/")) and len(mountpoint) > mountpoint_len:
+				mountpoint_len = len(mountpoint)
+				fstype = words[2]
+	#print("MVC: MountPoints: getFileSystemType: path: %s, fstype: %s" % (path, fstype))
+	return fstype
@@ -22,7 +22,7 @@
 from __init__ import _
 from Bookmarks import getHomeDir
 from FileProgress import FileProgress
-from FileCache import FILE_IDX_FILENAME, FILE_IDX_PATH, FILE_IDX_NAME
+from FileCache import LIST_IDX_FILENAME, LIST_IDX_PATH, LIST_IDX_NAME
 from MovieCoverDownload import MovieCoverDownload
 from DelayTimer import DelayTimer
 from FileListUtils import createFileList
@@ -46,9 +46,9 @@ class MovieCoverDownloadProgress(MovieCoverDownload, FileProgress):
 		DelayTimer(10, self.execMovieCoverDownloadProgress)
 
 	def doFileOp(self, entry):
-		filename = entry[FILE_IDX_FILENAME]
-		path = entry[FILE_IDX_PATH]
-		name = entry[FILE_IDX_NAME]
+		filename = entry[LIST_IDX_FILENAME]
+		path = entry[LIST_IDX_PATH]
+		name = entry[LIST_IDX_NAME]
 		self.file_name = filename
 		self.status = _("Please wait") + " ..."
 		self.updateProgress()
@@ -23,7 +23,6 @@ import os
 from __init__ import _
 from time import time
 from datetime import datetime
-from CutListUtils import ptsToSeconds, getCutListLast, unpackCutList
 from SkinUtils import getSkinPath
 from ServiceReference import ServiceReference
 from Components.config import config
@@ -32,7 +31,7 @@ from Components.TemplatedMultiContentComponent import TemplatedMultiContentCompo
 from Tools.LoadPixmap import LoadPixmap
 from skin import parseColor  # , parseFont, parseSize
 from enigma import eListbox, loadPNG
-from FileCache import FileCache, FILE_TYPE_FILE, FILE_IDX_PATH, FILE_IDX_DIR
+from FileCache import FileCache, FILE_TYPE_FILE, LIST_IDX_PATH, LIST_IDX_DIR, LIST_IDX_NAME
 from RecordingUtils import isCutting, isRecording
 from MountPoints import getMountPoint
 from FileUtils import readFile
@@ -40,6 +39,10 @@ from MovieListParseTemplate import parseTemplate
 from ServiceCenter import Info
 
 
+# number of entries before and after an entry to be shown, whose list rows are fetched together with its list row
+LIST_PREFETCH = 32
+
+
 class MovieList(TemplatedMultiContentComponent):
 
 	COMPONENT_ID = ""
@@ -54,6 +57,9 @@ class MovieList(TemplatedMultiContentComponent):
 		self.skinAttributes = None
 		TemplatedMultiContentComponent.__init__(self)
 		self.l.setBuildFunc(self.buildMovieListEntry)
+		self.filelist = []
+		self.list_index = {}
+		self.list_rows = {}
 
 		self.color = parseColor(config.plugins.moviecockpit.color.value).argb()
 		self.color_sel = parseColor(config.plugins.moviecockpit.color_sel.value).argb()
@@ -131,13 +137,32 @@ class MovieList(TemplatedMultiContentComponent):
 		return self.getCurrentPath()
 
 	def setList(self, filelist):
+		# filelist holds the key rows of the entries, the list rows are fetched for the entries around the shown ones
+		self.filelist = filelist
+		self.list_index = {}
+		for i, entry in enumerate(filelist):
+			if entry:
+				self.list_index[entry[LIST_IDX_PATH]] = i
+		self.list_rows = {}
 		self.l.setList(filelist)
 
+	def getListRow(self, entry):
+		path = entry[LIST_IDX_PATH]
+		if path not in self.list_rows:
+			index = self.list_index.get(path, 0)
+			paths = [list_entry[LIST_IDX_PATH] for list_entry in self.filelist[max(0, index - LIST_PREFETCH):index + LIST_PREFETCH + 1] if list_entry]
+			self.list_rows = FileCache.getInstance().getListRows(paths)
+		row = self.list_rows.get(path)
+		if row is None:
+			# the file is gone from the cache since the list was created
+			row = tuple(entry[:LIST_IDX_NAME + 1]) + (0, 0, "", "", 0, "", 0)
+		return row
+
 	def getCurrentPath(self):
-		return self.l.getCurrentSelection()[FILE_IDX_PATH]
+		return self.l.getCurrentSelection()[LIST_IDX_PATH]
 
 	def getCurrentDir(self):
-		return self.l.getCurrentSelection()[FILE_IDX_DIR]
+		return self.l.getCurrentSelection()[LIST_IDX_DIR]
 
 	def getCurrentIndex(self):
 		return self.instance.getCurrentIndex()
@@ -146,6 +171,8 @@ class MovieList(TemplatedMultiContentComponent):
 		return self.l.getCurrentSelection()
 
 	def invalidate(self):
+		# the list rows are fetched again, e.g. with changed progress
+		self.list_rows = {}
 		self.l.invalidate()
 
 	def invalidateList(self):
@@ -188,7 +215,7 @@ class MovieList(TemplatedMultiContentComponent):
 		template_attributes["width"] = self.l.getItemSize().width() - 15
 		self.applyTemplate(additional_locals=template_attributes)
 
-	def buildMovieListEntry(self, _directory, filetype, path, _filename, _ext, name, event_start_time, _recording_start_time, _recording_stop_time, length, description, _extended_description, service_reference, _size, cuts, tags):
+	def buildMovieListEntry(self, *entry):
 
 		def getPicon(service_reference):
 			pos = service_reference.rfind(':')
@@ -237,30 +264,23 @@ class MovieList(TemplatedMultiContentComponent):
 			#print("MVC: MovieList: getValues: count: %s, date_text: %s" % (count, date_text))
 			return date_text
 
-		def getProgress(recording, path, length, cuts):
+		def getProgress(recording, path, progress):
 			# All calculations are done in seconds
 			#print("MVC: MovieList: getProgress: path: %s" % path)
 
-			# first get last and length
+			# the progress of a recording follows the recording time,
+			# the progress of other files is kept by the cache and follows the last position of their cut file
 			if recording:
 				info = Info(path)
 				last = time() - info.getEventStartTime()
 				length = info.getLength()
-			else:
-				# Get last position from cut file
-				cut_list = unpackCutList(cuts)
-				#print("MVC: MovieList: getProgress: cut_list: " + str(cut_list))
-				last = ptsToSeconds(getCutListLast(cut_list))
-				#print("MVC: MovieList: getProgress: last: " + str(last))
-
-			# second calculate progress
-			progress = 0
-			if length > 0 and last > 0:
-				if last > length:
-					last = length
-				progress = int(round(float(last) / float(length), 2) * 100)
-
-			#print("MVC: MovieList: getProgress: progress: %s, path: %s, length: %s, recording: %s" % (progress, path, length, recording))
+				progress = 0
+				if length > 0 and last > 0:
+					if last > length:
+						last = length
+					progress = int(round(float(last) / float(length), 2) * 100)
+
+			#print("MVC: MovieList: getProgress: progress: %s, path: %s, recording: %s" % (progress, path, recording))
 			return progress
 
 		def getFileIcon(path, filetype, progress, recording, cutting):
@@ -303,12 +323,13 @@ class MovieList(TemplatedMultiContentComponent):
 
 		#print("MVC: MovieList: buildMovieListEntry: list_style: %s" % MovieList.list_styles[self.list_style][0])
 
+		_directory, filetype, path, _filename, _ext, name, event_start_time, length, description, service_reference, _size, tags, progress = self.getListRow(entry)
 		service = ServiceReference(service_reference)
 		service_name = service.getServiceName() if service is not None else ""
 		recording = isRecording(path)
 		cutting = isCutting(path)
 		color, color_sel = getColor(path, filetype, recording, cutting)
-		progress = getProgress(recording, path, length, cuts) if filetype == FILE_TYPE_FILE else -1
+		progress = getProgress(recording, path, progress) if filetype == FILE_TYPE_FILE else -1
 		progress_string = str(progress) + "%" if progress >= 0 else ""
 		progress_bar = self.pic_rec_progress_bar if recording else self.pic_progress_bar
 		length_string = str(length / 60) + " " + _("min") if filetype == FILE_TYPE_FILE else ""
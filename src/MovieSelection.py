@@ -31,15 +31,17 @@ from enigma import eTimer, eSize
 from ServiceReference import ServiceReference
 from Screens.TimerEdit import TimerEditList
 from Screens.LocationBox import LocationBox
+from Screens.VirtualKeyBoard import VirtualKeyBoard
+from Screens.ChoiceBox import ChoiceBox
 from Tools.BoundFunction import boundFunction
 from enigma import getDesktop
 from Components.Sources.MVCServiceEvent import MVCServiceEvent
 from ServiceCenter import ServiceCenter
 from MovieSelectionContextMenu import MovieSelectionContextMenu
 from RecordingUtils import isRecording, stopRecording
-from CutList import updateCutList, deleteCutList, removeCutListMarks
+from CutList import updateCutList, deleteCutLists, removeCutListMarks
 from FileOps import FileOps, FILE_OP_DELETE, FILE_OP_MOVE, FILE_OP_COPY
-from FileCache import FILE_IDX_PATH, FILE_IDX_TYPE, FILE_IDX_EXT, FILE_IDX_NAME, FILE_TYPE_DIR
+from FileCache import FileCache, TAG_DIR, LATEST_DIR, UNWATCHED_DIR, LIST_IDX_PATH, LIST_IDX_TYPE, LIST_IDX_EXT, LIST_IDX_NAME, FILE_TYPE_DIR
 from FileOpsProgress import FileOpsProgress
 from FileCacheLoadProgress import FileCacheLoadProgress
 from ServiceUtils import EXT_VIDEO
@@ -49,7 +51,7 @@ from MovieInfoTMDB import MovieInfoTMDB
 from MediaCenter import MediaCenter
 from MovieList import MovieList
 from MovieSelectionContextMenu import MENU_FUNCTIONS, MENU_PLUGINS
-from FileListUtils import getIndex4Path, getService4Path, getEntry4Path, loadedDirs, createFileList, createDirList, createCustomList, sortList
+from FileListUtils import getIndex4Path, getService4Path, getEntry4Path, loadedDirs, createFileList, createSortedList, createCustomList, getSearchDir, isSearchDir, getTagDir, isTagDir, isViewDir, SEARCH_DIR
 from ConfigScreen import ConfigScreen
 from StylesScreen import StylesScreen
 from MovieSelectionKeyFunctions import KeyFunctions
@@ -118,6 +120,7 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 		if self.current_sort_mode is None:
 			self.current_sort_mode = config.plugins.moviecockpit.list_sort.value
 		self.short_key = True  # used for long / short key press detection
+		self.search_text = ""
 		self.delayTimer = eTimer()
 		self.delayTimer_conn = self.delayTimer.timeout.connect(self.updateInfoDelayed)
 
@@ -242,7 +245,7 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 			path = self["list"].getCurrentPath()
 			#print("MVC: MovieSelection: showMovieInfoEPG: path: %s" % path)
 			epg_available = False
-			if path and self["list"].getCurrentSelection()[FILE_IDX_EXT] in EXT_VIDEO:
+			if path and self["list"].getCurrentSelection()[LIST_IDX_EXT] in EXT_VIDEO:
 				service = getService4Path(self.filelist, path)
 				if service:
 					event = ServiceCenter.getInstance().info(service).getEvent()
@@ -260,8 +263,8 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 		self.short_key = False
 		path = self["list"].getCurrentPath()
 		entry = getEntry4Path(self.filelist, path)
-		if entry and entry[FILE_IDX_EXT] in EXT_VIDEO:
-			name = entry[FILE_IDX_NAME]
+		if entry and entry[LIST_IDX_EXT] in EXT_VIDEO:
+			name = entry[LIST_IDX_NAME]
 			self.session.openWithCallback(self.showMovieInfoTMDBCallback, MovieInfoTMDB, path, name)
 
 	def showMovieInfoTMDBCallback(self):
@@ -287,6 +290,29 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 		if path:
 			self.changeDir(os.path.normpath(path))
 
+	def openSearch(self):
+		self.session.openWithCallback(self.openSearchCallback, VirtualKeyBoard, title=_("Search"), text=self.search_text)
+
+	def openSearchCallback(self, text=None):
+		if text:
+			self.search_text = text
+			self.return_path = None
+			self.changeDir(getSearchDir(text))
+			if not isSearchDir(self["list"].getCurrentDir()):
+				self.session.open(MessageBox, _("No matching recordings found"), MessageBox.TYPE_INFO, timeout=5)
+
+	def openTags(self):
+		tags = FileCache.getInstance().getTags()
+		if tags:
+			self.session.openWithCallback(self.openTagsCallback, ChoiceBox, title=_("Tags"), list=[("%s (%d)" % (tag, count), tag) for tag, count in tags])
+		else:
+			self.session.open(MessageBox, _("No tags found"), MessageBox.TYPE_INFO, timeout=5)
+
+	def openTagsCallback(self, answer=None):
+		if answer:
+			self.return_path = None
+			self.changeDir(getTagDir(answer[1]))
+
 	def videoFuncShort(self):
 		if not self.short_key:
 			self.short_key = True
@@ -320,7 +346,15 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 	def updateTitle(self):
 		title = "MovieCockpit"
 		current_dir = self["list"].getCurrentDir()
-		if current_dir:
+		if isSearchDir(current_dir):
+			title += " - " + _("Search results for") + ": " + current_dir[len(SEARCH_DIR):]
+		elif isTagDir(current_dir):
+			title += " - " + _("Tag") + ": " + current_dir[len(TAG_DIR):]
+		elif current_dir == LATEST_DIR:
+			title += " - " + _("Latest recordings")
+		elif current_dir == UNWATCHED_DIR:
+			title += " - " + _("Unwatched recordings")
+		elif current_dir:
 			title += " - "
 			title += _("trashcan") if os.path.basename(current_dir) == "trashcan" else _("Recordings")
 		self.setTitle(title)
@@ -361,20 +395,33 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 
 	def reloadList(self, path):
 		#print("MVC: MovieSelection: loadListRecording: path: %s" % path)
+		self.reloadLists([path])
+
+	def reloadLists(self, paths):
+		# the list is reloaded once, if it shows one of paths or a view
 		#print("MVC: MovieSelection: loadedDirs: %s" % loadedDirs(self.filelist))
-		if path in loadedDirs(self.filelist):
-			self.loadList(path)
+		loaded_dirs = loadedDirs(self.filelist)
+		for path in paths:
+			if path in loaded_dirs:
+				self.loadList(path)
+				return
+		# the files of views may come from any dir
+		for loaded_dir in loaded_dirs:
+			if isViewDir(loaded_dir):
+				self.loadList(loaded_dir)
+				return
 
 	def loadList(self, path):
 		#print("MVC: MovieSelection: loadList: path: %s" % path)
 		#print("MVC: MovieSelection: loadList start: self.return_path: %s" % self.return_path)
 		self.resetInfo()
 		MovieList.selection_list = []
-		filelist = createFileList(path)
-		if config.plugins.moviecockpit.directories_show.value:
-			filelist += createDirList(path)
 		custom_list = createCustomList(path)
-		self.filelist = custom_list + sortList(filelist, self.current_sort_mode)
+		self.filelist = custom_list + createSortedList(path, self.current_sort_mode)
+		if not self.filelist and isViewDir(path):
+			# no files (left) in the view
+			self.loadList(getHomeDir())
+			return
 		self["list"].setList(self.filelist)
 		if self.return_path:
 			self.moveToPath(self.return_path)
@@ -408,7 +455,7 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 	def selectAll(self):
 		#print("MVC: MovieSelection: selectAll")
 		for entry in self.filelist:
-			self.selectPath(entry[FILE_IDX_PATH])
+			self.selectPath(entry[LIST_IDX_PATH])
 
 	def unselectAll(self):
 		#print("MVC: MovieSelection: unselectAll")
@@ -439,7 +486,7 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 	def entrySelected(self):
 		path = self["list"].getCurrentPath()
 		if path:
-			if self["list"].getCurrentSelection()[FILE_IDX_TYPE] == FILE_TYPE_DIR:
+			if self["list"].getCurrentSelection()[LIST_IDX_TYPE] == FILE_TYPE_DIR:
 				self.changeDir(path)
 			else:
 				if self.enable_mini_tv:
@@ -619,7 +666,7 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 		self.exec_progress = False
 		for path in selection_list:
 			#print("MVC: MovieSelection: deleteFile: %s" % path)
-			filetype = getEntry4Path(self.filelist, path)[FILE_IDX_TYPE]
+			filetype = getEntry4Path(self.filelist, path)[LIST_IDX_TYPE]
 			directory = os.path.dirname(path)
 			if not config.plugins.moviecockpit.trashcan_enable.value or os.path.basename(directory) == "trashcan":
 				self.file_ops_list.append((FILE_OP_DELETE, path, None, filetype))
@@ -685,7 +732,7 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 			#print("MVC: MovieSelection: targetDirSelected: self.selection_list: %s" % self.selection_list)
 			for path in self.selection_list:
 				if not isRecording(path):
-					filetype = getEntry4Path(self.filelist, path)[FILE_IDX_TYPE]
+					filetype = getEntry4Path(self.filelist, path)[LIST_IDX_TYPE]
 					file_ops_list.append((file_op, path, os.path.normpath(target_path), filetype))
 					file_path_list.append(path)
 					exec_progress |= getMountPoint(path) != getMountPoint(target_path)
@@ -721,8 +768,8 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 			self.return_path = self["list"].getCurrentPath()
 			filelist = createFileList(getHomeDir() + "/trashcan")
 			for afile in filelist:
-				path = afile[FILE_IDX_PATH]
-				filetype = afile[FILE_IDX_TYPE]
+				path = afile[LIST_IDX_PATH]
+				filetype = afile[LIST_IDX_TYPE]
 				file_ops_list.append((FILE_OP_DELETE, path, None, filetype))
 			#print("MVC: MovieSelection: emptyTrash: file_ops_list: %s" % file_ops_list)
 			self.execFileOps(file_ops_list, [], False)
@@ -738,8 +785,7 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 
 	def deleteCutListFile(self):
 		selection_list = self.getSelectionList()
-		for path in selection_list:
-			deleteCutList(path)
+		deleteCutLists(selection_list)
 		self.unselectAll()
 		#print("MVC: MovieSelection: deleteCutListFile: deleted file")
 
@@ -754,15 +800,15 @@ class MovieSelection(Screen, HelpableScreen, KeyFunctions, FileOps):
 		#print("MVC: MovieSelection: execFileOps: path: %s" % path)
 
 		if path in path_list:
-			self.return_path = self.filelist[0][FILE_IDX_PATH]  # first service in list
+			self.return_path = self.filelist[0][LIST_IDX_PATH]  # first service in list
 			index = 0
 			for index, _entry in enumerate(self.filelist):
-				if self.filelist[index][FILE_IDX_PATH] == path:
+				if self.filelist[index][LIST_IDX_PATH] == path:
 					break
 			#print("MVC: MovieSelection: execFileOps: index 1: %s" % index)
 			while (index < len(self.filelist) - 1) and path in path_list:
 				index += 1
-				path = self.filelist[index][FILE_IDX_PATH]
+				path = self.filelist[index][LIST_IDX_PATH]
 			#print("MVC: MovieSelection: execFileOps: index 2: %s" % index)
 			if path not in path_list:
 				self.return_path = path
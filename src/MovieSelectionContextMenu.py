@@ -28,6 +28,8 @@ from Components.PluginComponent import plugins
 from Screens.Screen import Screen
 from Components.Sources.StaticText import StaticText
 from Bookmarks import isBookmark
+from FileListUtils import isViewDir
+from FileCache import LATEST_DIR, UNWATCHED_DIR
 from MovieList import MovieList
 from Screens.HelpMenu import HelpableScreen
 from Plugins.Plugin import PluginDescriptor
@@ -64,7 +66,9 @@ class MovieSelectionContextMenu(Screen, HelpableScreen):
 		if menu_mode == MENU_FUNCTIONS:
 			self.setTitle(_("Select function"))
 
-			if current_dir and not isBookmark(os.path.realpath(current_dir)):
+			if isViewDir(current_dir):
+				menu.append((_("Movie home"), (csel.moveToMovieHome, True)))
+			elif current_dir and not isBookmark(os.path.realpath(current_dir)):
 				menu.append((_("Movie home"), (csel.moveToMovieHome, True)))
 				menu.append((_("Directory up"), (boundFunction(csel.changeDir, current_dir + "/.."), True)))
 
@@ -82,6 +86,10 @@ class MovieSelectionContextMenu(Screen, HelpableScreen):
 			menu.append((_("Delete cutlist file"), (csel.deleteCutListFile, True)))
 
 			menu.append((_("Bookmarks"), (csel.openBookmarks, False)))
+			menu.append((_("Search"), (csel.openSearch, False)))
+			menu.append((_("Tags"), (csel.openTags, False)))
+			menu.append((_("Latest recordings"), (boundFunction(csel.changeDir, LATEST_DIR), True)))
+			menu.append((_("Unwatched recordings"), (boundFunction(csel.changeDir, UNWATCHED_DIR), True)))
 
 			for list_style in range(len(MovieList.list_styles)):
 				menu.append((_(MovieList.list_styles[list_style][1]), (boundFunction(csel.setListStyle, list_style), True)))
@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# coding=utf-8
+#
+# Copyright (C) 2018-2020 by dream-alpha
+#
+# In case of reuse of this source code please do not remove this copyright.
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	For more information on the GNU General Public License see:
+#	<http://www.gnu.org/licenses/>.
+
+
+import os
+try:
+	import cPickle as pickle
+except ImportError:
+	import pickle
+from threading import local, Lock
+from sqlite3 import dbapi2 as sqlite
+from Components.config import config
+from FileUtils import fileExists
+from ParserEitFile import ParserEitFile
+from ParserMetaFile import ParserMetaFile
+
+
+# increase, if the meta or eit dicts of the parsers change
+PARSER_CACHE_VERSION = 1
+
+
+class ParserCache():
+	# persistent cache of the meta and eit dicts of recordings in the parser_cache table of the cache database,
+	# which is not cleared with the recordings, so that rebuilds of the cache do not parse all files again.
+	# an entry is valid as long as the recording and its sidecar files keep their size and mtime.
+	# entries are looked up per path by the worker threads, each with its own read connection,
+	# new entries are written by the owner of the cache with getChangedRows()
+
+	def __init__(self, sql_db_name):
+		self.sql_db_name = sql_db_name
+		self.thread_local = local()
+		self.lock = Lock()
+		self.connections = []
+		self.changed = {}
+		self.used = set()
+
+	def close(self):
+		# must not be called while worker threads look up entries
+		for conn in self.connections:
+			conn.close()
+		self.connections = []
+
+	def getChangedRows(self):
+		# returns the (path, signature, meta, eit) rows of the entries which were parsed since the last call, pickled
+		rows = [(path, self.__dumps(signature), self.__dumps(meta), self.__dumps(eit)) for path, (signature, meta, eit) in self.changed.items()]
+		self.changed = {}
+		return rows
+
+	def getUsedPaths(self):
+		# returns the paths of the entries which were looked up since the last call
+		used = self.used
+		self.used = set()
+		return used
+
+	def __dumps(self, value):
+		return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+	def __getCursor(self):
+		cursor = getattr(self.thread_local, "cursor", None)
+		if cursor is None:
+			conn = sqlite.connect(self.sql_db_name, check_same_thread=False)
+			conn.text_factory = str
+			with self.lock:
+				self.connections.append(conn)
+			cursor = self.thread_local.cursor = conn.cursor()
+		return cursor
+
+	def __selectEntry(self, path, signature):
+		# returns the cached (meta, eit) of path, if it was parsed from files with signature
+		try:
+			cursor = self.__getCursor()
+			cursor.execute("SELECT signature, meta, eit FROM parser_cache WHERE path = ?", (path,))
+			row = cursor.fetchone()
+			if row and pickle.loads(bytes(row[0])) == signature:
+				return pickle.loads(bytes(row[1])), pickle.loads(bytes(row[2]))
+		except Exception as e:
+			print("MVC-E: ParserCache: __selectEntry: path: %s, exception: %s" % (path, e))
+		return None
+
+	def getSignature(self, path, dir_names=None, path_stat=None):
+		# the default values of the parsers depend on the recording and the recording margins,
+		# their results on the sidecar files, including those of the uncut recording
+		if path_stat is None:
+			path_stat = os.stat(path)
+		signature = [PARSER_CACHE_VERSION, int(path_stat.st_ctime), int(path_stat.st_size), config.recording.margin_before.value, config.recording.margin_after.value]
+		filepath, ext = os.path.splitext(path)
+		sidecar_paths = [filepath + ".eit", path + ".meta", path + ".xmeta"]
+		if filepath[-4:-3] == "_" and filepath[-3:].isdigit():
+			sidecar_paths += [filepath[:-4] + ".eit", filepath[:-4] + ext + ".meta", filepath[:-4] + ext + ".xmeta"]
+		for sidecar_path in sidecar_paths:
+			if fileExists(sidecar_path, dir_names):
+				try:
+					sidecar_stat = os.stat(sidecar_path)
+					signature.append((os.path.basename(sidecar_path), int(sidecar_stat.st_size), int(sidecar_stat.st_mtime)))
+				except OSError:
+					pass
+		return tuple(signature)
+
+	def getMetaEit(self, path, dir_names=None, path_stat=None):
+		# returns the meta and eit dicts of the recording path, parses its sidecar files only if they changed;
+		# called by the FileCacheLoader worker threads
+		signature = self.getSignature(path, dir_names, path_stat)
+		entry = self.__selectEntry(path, signature)
+		if entry:
+			meta, eit = entry
+		else:
+			meta = ParserMetaFile(path, dir_names, path_stat).getMeta()
+			eit = ParserEitFile(path, dir_names, path_stat).getEit()
+			self.changed[path] = (signature, meta, eit)
+		self.used.add(path)
+		return meta, eit
@@ -26,7 +26,7 @@ import struct
 import re
 from Components.config import config
 from Tools.ISO639 import LanguageCodes
-from FileUtils import readFile
+from FileUtils import readFile, fileExists
 import datetime
 import time
 from UnicodeUtils import convertToUtf8
@@ -34,9 +34,10 @@ from UnicodeUtils import convertToUtf8
 
 class ParserEitFile():
 
-	def __init__(self, path):
+	def __init__(self, path, dir_names=None, path_stat=None):
+		# dir_names and path_stat are optional results of a dir scan, which save the file system lookups
 		self.eit = {
-			"start": int(os.stat(path).st_ctime),
+			"start": int((path_stat or os.stat(path)).st_ctime),
 			"length": 0,
 			"name": convertToUtf8(os.path.basename(path)),
 			"short_description": "",
@@ -64,12 +65,12 @@ class ParserEitFile():
 		if path:
 			path, _ext = os.path.splitext(path)
 			eit_path = path + ".eit"
-			if not os.path.exists(eit_path):
+			if not fileExists(eit_path, dir_names):
 				# Strip existing cut number
 				if path[-4:-3] == "_" and path[-3:].isdigit():
 					path = path[:-4]
 					eit_path = path + ".eit"
-					if not os.path.exists(eit_path):
+					if not fileExists(eit_path, dir_names):
 						eit_path = ""
 			if eit_path:
 				data = readFile(eit_path)
@@ -20,7 +20,7 @@
 
 
 import os
-from FileUtils import readFile, writeFile
+from FileUtils import readFile, writeFile, fileExists
 from Components.config import config
 
 
@@ -44,11 +44,13 @@ XMETA_IDX_MARGINAFTER = 5
 
 class ParserMetaFile():
 
-	def __init__(self, path):
+	def __init__(self, path, dir_names=None, path_stat=None):
+		# dir_names and path_stat are optional results of a dir scan, which save the file system lookups
 		self.path = path
+		self.dir_names = dir_names
 		self.meta_path = path + ".meta"
 		self.xmeta_path = path + ".xmeta"
-		if not os.path.exists(self.meta_path):
+		if not fileExists(self.meta_path, dir_names):
 			path, ext = os.path.splitext(path)
 			# remove cut number
 			if path[-4:-3] == "_" and path[-3:].isdigit():
@@ -59,13 +61,13 @@ class ParserMetaFile():
 		while len(self.meta_list) <= META_IDX_SERVICEDATA:
 			self.meta_list.append("")
 		if not self.meta_list[META_IDX_RECTIME]:
-			self.meta_list[META_IDX_RECTIME] = int(os.stat(self.path).st_ctime)
+			self.meta_list[META_IDX_RECTIME] = int((path_stat or os.stat(self.path)).st_ctime)
 		if not self.meta_list[META_IDX_LENGTH]:
 			self.meta_list[META_IDX_LENGTH] = 0
 		else:
 			self.meta_list[META_IDX_LENGTH] = int(self.meta_list[META_IDX_LENGTH]) / 90000
 		if not self.meta_list[META_IDX_FILESIZE]:
-			self.meta_list[META_IDX_FILESIZE] = int(os.path.getsize(self.path))
+			self.meta_list[META_IDX_FILESIZE] = int(path_stat.st_size if path_stat else os.path.getsize(self.path))
 
 		self.xmeta_list = self.readMeta(self.xmeta_path)
 		while len(self.xmeta_list) <= XMETA_IDX_MARGINAFTER:
@@ -84,6 +86,8 @@ class ParserMetaFile():
 			self.xmeta_list[XMETA_IDX_MARGINAFTER] = config.recording.margin_after.value * 60
 
 	def readMeta(self, path):
+		if self.dir_names is not None and not fileExists(path, self.dir_names):
+			return []
 		meta_list = readFile(path).splitlines()
 		meta_list = [l.strip() for l in meta_list]
 		return meta_list
@@ -23,7 +23,7 @@ import os
 import time
 from Components.config import config
 from DelayTimer import DelayTimer
-from FileCache import FileCache, FILE_IDX_PATH, FILE_IDX_TYPE
+from FileCache import FileCache, LIST_IDX_PATH, LIST_IDX_TYPE
 from FileOps import FileOps, FILE_OP_DELETE
 from Bookmarks import getBookmarks, getHomeDir
 from FileUtils import createDirectory
@@ -75,7 +75,7 @@ class Trashcan(FileOps):
 				rc = createDirectory(path)
 				if not rc:
 					print("MVC-I: Trashcan: enableTrashcan: successful: %s" % path)
-					FileCache.getInstance().loadDatabase([path], sync=True)
+					FileCache.getInstance().loadDatabase([path], sync=True, resync=True)
 					config.plugins.moviecockpit.trashcan_enable.value = True
 				else:
 					print("MVC-E: Trashcan: enableTrashcan: failed: %s" % path)
@@ -89,8 +89,8 @@ class Trashcan(FileOps):
 		now = time.localtime()
 		filelist = createFileList(getHomeDir() + "/trashcan")
 		for afile in filelist:
-			path = afile[FILE_IDX_PATH]
-			filetype = afile[FILE_IDX_TYPE]
+			path = afile[LIST_IDX_PATH]
+			filetype = afile[LIST_IDX_TYPE]
 			if os.path.exists(path):
 				if now > time.localtime(os.stat(path).st_mtime + 24 * 60 * 60 * int(config.plugins.moviecockpit.trashcan_retention.value)):
 					#print("MVC: Trashcan: purgeTrashcan: path: " + path)
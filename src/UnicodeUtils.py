@@ -19,6 +19,13 @@
 #	<http://www.gnu.org/licenses/>.
 
 
+import unicodedata
+
+
+# leading articles which are ignored by getSortKey() on request
+SORT_ARTICLES = [u"the ", u"a ", u"an ", u"der ", u"die ", u"das ", u"ein ", u"eine ", u"le ", u"la ", u"les ", u"l'", u"el ", u"il "]
+
+
 def convertToUtf8(text, codepage="cp1252", first=True):
 	if text:
 		try:
@@ -32,3 +39,19 @@ def convertToUtf8(text, codepage="cp1252", first=True):
 			else:
 				print("MVC-E: UnicodeUtils: convertToUtf8: text: %s, codepage: %s, first: %s, exception: %s" % (text, codepage, first, e))
 	return text.strip()
+
+
+def getSortKey(text, strip_articles=False):
+	# case and accent folded utf-8 key of text for sorting names, so that e.g. "Ärger" sorts with "arger"
+	try:
+		key = text.decode("utf-8")
+	except (UnicodeDecodeError, AttributeError):
+		key = text.decode("iso-8859-1") if isinstance(text, bytes) else text
+	key = unicodedata.normalize("NFKD", key.lower().replace(u"\xdf", u"ss"))
+	key = u"".join([c for c in key if not unicodedata.combining(c)]).strip()
+	if strip_articles:
+		for article in SORT_ARTICLES:
+			if key.startswith(article) and len(key) > len(article):
+				key = key[len(article):].lstrip()
+				break
+	return key.encode("utf-8")
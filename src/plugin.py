@@ -27,6 +27,7 @@ from Plugins.Plugin import PluginDescriptor
 from Screens.InfoBar import InfoBar
 from Tools.BoundFunction import boundFunction
 from FileCache import FileCache
+from FileCacheWatcher import FileCacheWatcher
 from ConfigInit import ConfigInit
 from RecordingControl import RecordingControl
 from SkinUtils import initPluginSkinPath, loadPluginSkin
@@ -76,6 +77,8 @@ def autostart(reason, **kwargs):
 			ConfigScreen.setEPGLanguage()
 			RecordingControl()
 			FileCache.getInstance()
+			if config.plugins.moviecockpit.cache_watch.value:
+				FileCacheWatcher.getInstance()
 			Trashcan.getInstance()
 			initPluginSkinPath()
 			applyPluginStyle()
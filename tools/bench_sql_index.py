@@ -0,0 +1,96 @@
+#!/usr/bin/python
+# coding=utf-8
+#
+# Benchmark of the primary key and index of the recordings table:
+# path and directory lookups in a table of a plugin version without them,
+# the in-place migration, and the same lookups after the migration.
+#
+# usage: python tools/bench_sql_index.py [db_path]
+# the database at db_path (default: /tmp/bench_sql_index.db) is overwritten
+
+from __future__ import print_function
+import os
+import sys
+import time
+import random
+from sqlite3 import dbapi2 as sqlite
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from FileCacheSQL import FileCacheSQL, SQL_FILEDATA  # noqa: E402
+
+
+RECORDINGS = 25000
+DIRS = ["/media/hdd/movie/d%03d" % i for i in range(250)]
+SAMPLE_FILES = 500
+SAMPLE_DIRS = 100
+
+# recordings table of the plugin versions before schema versioning
+OLD_TABLE = (
+	"CREATE TABLE recordings (directory TEXT, filetype INTEGER, path TEXT, fileName TEXT, fileExt TEXT, name TEXT,"
+	" event_start_time INTEGER, recording_start_time INTEGER, recording_stop_time INTEGER, length INTEGER,"
+	" description TEXT, extended_description TEXT, service_reference TEXT, size INTEGER, cuts TEXT, tags TEXT)"
+)
+
+
+def getRows():
+	for i in range(RECORDINGS):
+		adir = DIRS[i % len(DIRS)]
+		path = "%s/2020%04d 2015 - Channel - Title %d.ts" % (adir, i, i)
+		yield (adir, 1, path, os.path.basename(path)[:-3], ".ts", "Title %d" % i, 1500000000 + i, 0, 0, 3600, "short", "x" * 800, "1:0:19", 10 ** 9, "", "")
+
+
+def createOldDatabase(db_path):
+	for path in [db_path, db_path + "-wal", db_path + "-shm"]:
+		if os.path.exists(path):
+			os.remove(path)
+	conn = sqlite.connect(db_path)
+	conn.text_factory = str
+	conn.execute(OLD_TABLE)
+	conn.executemany("INSERT INTO recordings VALUES (" + ", ".join(["?"] * 16) + ")", getRows())
+	conn.commit()
+	conn.close()
+
+
+def timeLookups(label, get_file, get_file_list):
+	random.seed(1)
+	paths = random.sample([row[2] for row in getRows()], SAMPLE_FILES)
+	start = time.time()
+	for path in paths:
+		get_file(path)
+	file_ms = (time.time() - start) / len(paths) * 1000
+	start = time.time()
+	for adir in DIRS[:SAMPLE_DIRS]:
+		get_file_list(adir)
+	dir_ms = (time.time() - start) / SAMPLE_DIRS * 1000
+	print("%-7s getFile lookup: %.2f ms per query, getFileList lookup: %.2f ms per query" % (label, file_ms, dir_ms))
+
+
+def main():
+	db_path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/bench_sql_index.db"
+	print("sqlite %s, %d recordings in %d directories" % (sqlite.sqlite_version, RECORDINGS, len(DIRS)))
+	createOldDatabase(db_path)
+
+	conn = sqlite.connect(db_path)
+	conn.text_factory = str
+	cursor = conn.cursor()
+
+	def getOldFile(path):
+		cursor.execute("SELECT " + SQL_FILEDATA + " FROM recordings WHERE path = ?", (path,))
+		return cursor.fetchall()
+
+	def getOldFileList(adir):
+		cursor.execute("SELECT " + SQL_FILEDATA + " FROM recordings WHERE directory = ? AND filetype = 1", (adir,))
+		return cursor.fetchall()
+
+	timeLookups("before", getOldFile, getOldFileList)
+	conn.close()
+
+	start = time.time()
+	sql = FileCacheSQL(db_path)
+	print("one-time migration: %.2f s" % (time.time() - start))
+	timeLookups("after", sql.sqlSelectFile, lambda adir: sql.sqlSelectFileList([adir], 1))
+	sql.sqlClose()
+
+
+if __name__ == "__main__":
+	main()
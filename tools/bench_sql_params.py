@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# coding=utf-8
+#
+# Benchmark of the file cache queries with bound parameters against the same queries
+# built by string concatenation, as the plugin did before: getFile, exists and getFileList over 3 directories.
+#
+# usage: python tools/bench_sql_params.py [db_path]
+# the database at db_path (default: /tmp/bench_sql_params.db) is overwritten
+
+from __future__ import print_function
+import os
+import sys
+import time
+import random
+from sqlite3 import dbapi2 as sqlite
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from FileCacheSQL import FileCacheSQL, SQL_FILEDATA  # noqa: E402
+
+
+RECORDINGS = 25000
+DIRS = ["/media/hdd/movie/d%03d" % i for i in range(250)]
+SAMPLE_FILES = 5000
+SAMPLE_LISTS = 500
+
+
+def getRows():
+	for i in range(RECORDINGS):
+		adir = DIRS[i % len(DIRS)]
+		path = "%s/2020%04d 2015 - Channel - Title %d.ts" % (adir, i, i)
+		yield (adir, 1, path, os.path.basename(path)[:-3], ".ts", "Title %d" % i, 1500000000 + i, 0, 0, 3600, "short", "x" * 800, "1:0:19", 10 ** 9, "", "")
+
+
+def timeQueries(label, function, samples):
+	start = time.time()
+	for sample in samples:
+		function(sample)
+	print("%-36s %7.1f us per query" % (label, (time.time() - start) / len(samples) * 1000000))
+
+
+def main():
+	db_path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/bench_sql_params.db"
+	print("sqlite %s, %d recordings in %d directories" % (sqlite.sqlite_version, RECORDINGS, len(DIRS)))
+	for path in [db_path, db_path + "-wal", db_path + "-shm"]:
+		if os.path.exists(path):
+			os.remove(path)
+	sql = FileCacheSQL(db_path)
+	sql.sqlInsertList(list(getRows()))
+	sql.sqlCommit()
+	cursor = sql.cursor
+
+	random.seed(1)
+	paths = random.sample([row[2] for row in getRows()], SAMPLE_FILES)
+	dir_lists = [random.sample(DIRS, 3) for _i in range(SAMPLE_LISTS)]
+
+	def getFileConcatenated(path):
+		cursor.execute("SELECT " + SQL_FILEDATA + " FROM recordings WHERE path = \"" + path + "\"")
+		return cursor.fetchall()
+
+	def getFileListConcatenated(dirs):
+		where = "(" + " OR ".join(["directory = \"" + adir + "\"" for adir in dirs]) + ") AND filetype = 1"
+		cursor.execute("SELECT " + SQL_FILEDATA + " FROM recordings WHERE " + where)
+		return cursor.fetchall()
+
+	# exists() used to select the whole row, like getFile()
+	timeQueries("getFile, concatenated", getFileConcatenated, paths)
+	timeQueries("getFile, bound", sql.sqlSelectFile, paths)
+	timeQueries("exists, concatenated SELECT", getFileConcatenated, paths)
+	timeQueries("exists, bound SELECT 1 LIMIT 1", sql.sqlExists, paths)
+	timeQueries("getFileList 3 dirs, concatenated", getFileListConcatenated, dir_lists)
+	timeQueries("getFileList 3 dirs, bound", lambda dirs: sql.sqlSelectFileList(dirs, 1), dir_lists)
+	sql.sqlClose()
+
+
+if __name__ == "__main__":
+	main()
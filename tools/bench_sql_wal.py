@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# coding=utf-8
+#
+# Benchmark of the list query latency on the read connection of FileCacheSQL,
+# while another connection writes a shadow table in 500 row commits, like a rebuild in the background:
+# with a rollback journal (as before) and with the write-ahead log.
+#
+# usage: python tools/bench_sql_wal.py [db_path]
+# the database at db_path (default: /tmp/bench_sql_wal.db) is overwritten, it should be on the file system to measure
+
+from __future__ import print_function
+import os
+import sys
+import time
+from threading import Thread
+from sqlite3 import dbapi2 as sqlite
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from FileCacheSQL import FileCacheSQL  # noqa: E402
+
+
+RECORDINGS = 20000
+DIRS = 50
+COMMIT_ROWS = 500
+DURATION = 3
+QUERY_INTERVAL = 0.005
+
+
+def run(db_path, wal):
+	for path in [db_path, db_path + "-wal", db_path + "-shm"]:
+		if os.path.exists(path):
+			os.remove(path)
+	sql = FileCacheSQL(db_path)
+	synchronous = "NORMAL" if wal else "FULL"
+	if not wal:
+		sql.read_cursor.close()
+		sql.sql_read_conn.close()
+		sql.sql_conn.execute("PRAGMA journal_mode = DELETE")
+		sql.sql_conn.execute("PRAGMA synchronous = " + synchronous)
+		sql.sql_read_conn = sqlite.connect(db_path)
+		sql.sql_read_conn.text_factory = str
+		sql.read_cursor = sql.sql_read_conn.cursor()
+	rows = [("/m/d%d" % (i % DIRS), 1, "/m/d%d/%d.ts" % (i % DIRS, i), "x" * 40) for i in range(RECORDINGS)]
+	sql.sql_conn.executemany("INSERT INTO recordings (directory, filetype, path, name) VALUES (?, ?, ?, ?)", rows)
+	sql.sqlCommit()
+
+	stopped = []
+
+	def write():
+		conn = sqlite.connect(db_path, timeout=10)
+		conn.execute("PRAGMA synchronous = " + synchronous)
+		conn.execute("CREATE TABLE shadow AS SELECT * FROM recordings WHERE 0")
+		i = 0
+		while not stopped:
+			conn.executemany("INSERT INTO shadow (directory, filetype, path, name) VALUES (?, ?, ?, ?)", rows[i:i + COMMIT_ROWS])
+			conn.commit()
+			i = (i + COMMIT_ROWS) % RECORDINGS
+		conn.close()
+
+	writer = Thread(target=write)
+	writer.start()
+	latencies = []
+	end_time = time.time() + DURATION
+	while time.time() < end_time:
+		start = time.time()
+		sql.sqlSelectFileList(["/m/d7"], 1, read=True)
+		latencies.append((time.time() - start) * 1000)
+		time.sleep(QUERY_INTERVAL)
+	stopped.append(True)
+	writer.join()
+	sql.sqlClose()
+	latencies.sort()
+	print("%-17s queries: %4d, p50: %.1f ms, p99: %.1f ms, max: %.1f ms" % (
+		"WAL:" if wal else "rollback journal:", len(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], latencies[-1]
+	))
+
+
+def main():
+	db_path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/bench_sql_wal.db"
+	print("sqlite %s, %d recordings, %d row commits for %d s" % (sqlite.sqlite_version, RECORDINGS, COMMIT_ROWS, DURATION))
+	run(db_path, False)
+	run(db_path, True)
+
+
+if __name__ == "__main__":
+	main()